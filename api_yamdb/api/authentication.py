@@ -0,0 +1,96 @@
+import copy
+import hashlib
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from .cache import LRUCache
+from .tokens import ClaimsUser, get_role_version, is_role_token
+
+DEFAULTS = {
+    'TOKENS_MAXSIZE': 4096,
+    'USERS_MAXSIZE': 1024,
+    # users may be changed without signals (queryset.update, other
+    # processes), so cached records are refreshed after the timeout
+    'USER_TIMEOUT': 60,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_AUTH_CACHE', {}).get(name, DEFAULTS[name])
+
+
+# validated tokens by sha256 of raw token
+token_cache = LRUCache(get_setting('TOKENS_MAXSIZE'))
+# active users by USER_ID_FIELD (username)
+user_cache = LRUCache(
+    get_setting('USERS_MAXSIZE'), timeout=get_setting('USER_TIMEOUT')
+)
+
+
+def invalidate_user(user):
+    user_cache.delete_where(lambda cached: cached.pk == user.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps verified tokens and users in process
+    memory, so authenticated requests need neither signature check nor
+    user query once the token has been seen.
+
+    Expiration of cached tokens is still checked on every request. Cached
+    users are dropped by signals when a user is saved or deleted and
+    after flush, every request gets its own copy of the cached user.
+
+    Read requests with RoleAccessToken are authenticated as ClaimsUser
+    built from the token, only the role version is looked up in cache to
+    check that the token is not revoked.
+    """
+
+    revoked_message = 'Права пользователя изменились, получите новый токен.'
+
+    def authenticate(self, request):
+        self.safe_method = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_validated_token(self, raw_token):
+        digest = hashlib.sha256(raw_token).hexdigest()
+        token = token_cache.get(digest)
+        if token is not None:
+            try:
+                # without current_time the token compares exp with the
+                # time it was validated at, i.e. put in the cache
+                token.check_exp(current_time=aware_utcnow())
+                return token
+            except TokenError:
+                # expired, let JWTAuthentication build the error response
+                pass
+        token = super().get_validated_token(raw_token)
+        token_cache.set(digest, token)
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        role_token = is_role_token(validated_token)
+        if role_token and self.safe_method:
+            if get_role_version(user_id) != validated_token['role_version']:
+                raise AuthenticationFailed(
+                    self.revoked_message, code='token_revoked'
+                )
+            return ClaimsUser(validated_token)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        if role_token and (
+            user.role_version != validated_token['role_version']
+        ):
+            raise AuthenticationFailed(
+                self.revoked_message, code='token_revoked'
+            )
+        return copy.copy(user)
@@ -0,0 +1,156 @@
+import io
+import json
+
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .writes import run_write
+
+BATCH_MAX_REQUESTS = 20
+BATCH_METHODS = ('GET', 'POST', 'PATCH', 'PUT', 'DELETE')
+BATCH_PATH_PREFIX = '/api/v1/'
+# headers of the batch request passed to sub-requests: credentials and
+# host, conditional and content headers belong to the batch request itself
+BATCH_META_KEYS = (
+    'HTTP_AUTHORIZATION',
+    'HTTP_HOST',
+    'HTTP_ACCEPT',
+    'HTTP_ACCEPT_LANGUAGE',
+    'HTTP_X_FORWARDED_FOR',
+    'HTTP_X_FORWARDED_HOST',
+    'HTTP_X_FORWARDED_PORT',
+    'HTTP_X_FORWARDED_PROTO',
+    'REMOTE_ADDR',
+    'SERVER_NAME',
+    'SERVER_PORT',
+    'wsgi.url_scheme',
+)
+
+
+def get_request_cache(request):
+    """
+    Returns dict that lives as long as the request. Sub-requests of a
+    batch share one dict, so objects looked up by one of them are reused
+    by the others.
+    """
+    django_request = getattr(request, '_request', request)
+    cache = getattr(django_request, 'request_cache', None)
+    if cache is None:
+        cache = django_request.request_cache = {}
+    return cache
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=BATCH_METHODS, default='GET')
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+    def validate_path(self, value):
+        path = value.split('?', 1)[0]
+        if not path.startswith(BATCH_PATH_PREFIX) or path.rstrip('/') == (
+            BATCH_PATH_PREFIX + 'batch'
+        ):
+            raise serializers.ValidationError(
+                f'Поддерживаются только адреса {BATCH_PATH_PREFIX}...'
+            )
+        return value
+
+
+def build_sub_request(request, method, path, body):
+    """
+    Builds django request for a sub-request. It takes credentials and host
+    headers of the batch request and is authenticated as the same user, so
+    authentication is performed only once for the whole batch.
+    """
+    path, _, query_string = path.partition('?')
+    payload = b''
+    if body is not None:
+        payload = json.dumps(body, cls=JSONEncoder).encode('utf-8')
+    sub_request = HttpRequest()
+    sub_request.method = method
+    sub_request.path = sub_request.path_info = path
+    sub_request.META = {
+        **{
+            key: request.META[key] for key in BATCH_META_KEYS
+            if key in request.META
+        },
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+    }
+    sub_request.GET = QueryDict(query_string)
+    sub_request.COOKIES = request.COOKIES
+    sub_request._stream = io.BytesIO(payload)
+    sub_request._read_started = False
+    if request.user and request.user.is_authenticated:
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+    sub_request.request_cache = get_request_cache(request)
+    return sub_request
+
+
+def run_sub_request(request, method, path, body):
+    try:
+        match = resolve(path.split('?', 1)[0])
+    except Resolver404:
+        return {
+            'status': status.HTTP_404_NOT_FOUND,
+            'headers': {},
+            'body': {'detail': 'Страница не найдена.'},
+        }
+
+    def dispatch():
+        # request body is a stream, so it's rebuilt for every attempt
+        sub_request = build_sub_request(request, method, path, body)
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        if method not in ('GET', 'HEAD') and response.status_code >= 400:
+            # DRF turns errors into responses without rolling back
+            transaction.set_rollback(True)
+        return response
+    if method in ('GET', 'HEAD'):
+        response = dispatch()
+    else:
+        response = run_write(dispatch)
+        # objects cached by previous sub-requests may be changed now
+        get_request_cache(request).clear()
+    return {
+        'status': response.status_code,
+        'headers': dict(response.items()),
+        'body': getattr(response, 'data', None),
+    }
+
+
+@api_view(['POST'])
+def batch(request):
+    '''
+    Executes a list of sub-requests to the API in one round trip:
+    [{"method": "GET", "path": "/api/v1/titles/1/"}, ...]
+    Sub-requests are executed in order against the existing views with
+    the caller's credentials. Every write sub-request runs in its own
+    transaction, so a failed one leaves no partial writes.
+    '''
+    serializer = SubRequestSerializer(data=request.data, many=True)
+    serializer.is_valid(raise_exception=True)
+    if len(serializer.validated_data) > BATCH_MAX_REQUESTS:
+        raise serializers.ValidationError(
+            f'Не больше {BATCH_MAX_REQUESTS} запросов за раз.'
+        )
+    return Response(
+        [
+            run_sub_request(
+                request,
+                sub_request['method'],
+                sub_request['path'],
+                sub_request.get('body'),
+            )
+            for sub_request in serializer.validated_data
+        ],
+        status=status.HTTP_200_OK,
+    )
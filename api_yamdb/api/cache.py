@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GLOBAL_NAMESPACE = 'global'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 5,
+    'KEY_PREFIX': 'api',
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_RESPONSE_CACHE', {}).get(
+        name, DEFAULTS[name]
+    )
+
+
+def get_cache():
+    return caches[get_setting('CACHE_ALIAS')]
+
+
+def version_key(namespace):
+    return f'{get_setting("KEY_PREFIX")}:version:{namespace}'
+
+
+def get_versions(namespaces):
+    """
+    Returns current version of every namespace. Versions are nanosecond
+    timestamps of the last write, so they also tell when the resource was
+    modified. Missing versions (never set or evicted) are initialized with
+    current time, so keys cached under evicted versions are never reused.
+
+    Global namespace, bumped after migrate and flush, is always included.
+    """
+    cache = get_cache()
+    namespaces = (GLOBAL_NAMESPACE,) + tuple(namespaces)
+    keys = {version_key(namespace): namespace for namespace in namespaces}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*namespaces):
+    cache = get_cache()
+    keys = [version_key(namespace) for namespace in namespaces]
+    current = cache.get_many(keys)
+    now = time.time_ns()
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys},
+        timeout=None,
+    )
+
+
+def invalidate(*namespaces):
+    """
+    Bumps namespace versions once current transaction is committed, so
+    readers can't cache data that is not committed yet under new version.
+    """
+    transaction.on_commit(lambda: bump_versions(*namespaces))
+
+
+def get_role(user):
+    if not user or user.is_anonymous:
+        return 'anonymous'
+    if user.is_superuser:
+        return 'superuser'
+    return user.role
+
+
+def response_cache_key(request, versions):
+    # host and scheme are part of the key since pagination links are absolute
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    location = hashlib.md5(
+        f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+        .encode('utf-8')
+    ).hexdigest()
+    return (
+        f'{get_setting("KEY_PREFIX")}:response:'
+        f'{".".join(str(version) for version in versions)}:'
+        f'{get_role(request.user)}:{location}'
+    )
+
+
+def get_etag(key):
+    return '"{}"'.format(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+
+def get_last_modified(versions):
+    """
+    Returns timestamp in seconds of the latest write among versions.
+    """
+    return max(versions) // 10 ** 9
+
+
+class LRUCache:
+    """
+    Thread-safe dict of bounded size that evicts least recently used
+    entries. Entries expire after `timeout` seconds if it's set.
+    """
+
+    def __init__(self, maxsize, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = None
+        if self.timeout is not None:
+            expires = time.monotonic() + self.timeout
+        with self.lock:
+            self.data[key] = (value, expires)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete_where(self, predicate):
+        with self.lock:
+            for key in [
+                key for key, (value, _) in self.data.items()
+                if predicate(value)
+            ]:
+                del self.data[key]
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
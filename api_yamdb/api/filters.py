@@ -1,6 +1,8 @@
 import django_filters
+from rest_framework.filters import SearchFilter
 
 from reviews.models import Title
+from reviews.search import normalize_name, search_names, search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -10,6 +12,8 @@ class TitleFilter(django_filters.FilterSet):
     filters name but filter by their slug field, we override filter here.
     Also name filter is expected to use 'icontains' lookup instead of
     'exact' which is default.
+    Search filter looks for words in name and description through
+    full-text index and orders results by relevance.
     """
 
     category = django_filters.CharFilter(field_name='category__slug')
@@ -17,6 +21,7 @@ class TitleFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(
         field_name='name', lookup_expr='icontains'
     )
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
@@ -25,4 +30,24 @@ class TitleFilter(django_filters.FilterSet):
             'year',
             'category',
             'genre',
+            'search',
         )
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class NameSearchFilter(SearchFilter):
+    """
+    Searches by the beginning of words of the name through FTS5 index
+    instead of regex lookup, that on SQLite calls python function for
+    every row of the table.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = normalize_name(
+            request.query_params.get(self.search_param, '')
+        )
+        if not term:
+            return queryset
+        return search_names(queryset, term)
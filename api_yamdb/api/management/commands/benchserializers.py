@@ -0,0 +1,136 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.serializers import (CommentSerializer, ReadOnlyTitleSerializer,
+                             ReviewSerializer)
+from api.values import compile_serializer
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+BENCH_PREFIX = 'bench-serializers'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость сериализации списков произведений, отзывов и '
+        'комментариев через DRF и через values(). Тестовые данные '
+        'создаются в транзакции, которая откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--objects',
+            type=int,
+            default=1000,
+            help='Количество объектов каждого вида',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов, берется лучшее время',
+        )
+
+    def create_objects(self, count):
+        category = Category.objects.create(
+            name=BENCH_PREFIX, slug=BENCH_PREFIX
+        )
+        Genre.objects.bulk_create(
+            Genre(
+                name=f'{BENCH_PREFIX} {index}',
+                slug=f'{BENCH_PREFIX}-{index}',
+            )
+            for index in range(3)
+        )
+        genres = list(Genre.objects.filter(slug__startswith=BENCH_PREFIX))
+        user = User.objects.create(
+            username=BENCH_PREFIX, email=f'{BENCH_PREFIX}@yamdb.fake'
+        )
+        Title.objects.bulk_create(
+            Title(
+                name=f'{BENCH_PREFIX} {index}',
+                year=1900 + index % 100,
+                description='Описание ' * 20,
+                category=category,
+                rating=index % 10 + 1,
+            )
+            for index in range(count)
+        )
+        titles = list(Title.objects.filter(category=category))
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title in titles
+            for genre in genres[:title.pk % len(genres) + 1]
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='Отзыв ' * 50, score=5)
+            for title in titles
+        )
+        reviews = Review.objects.filter(author=user)
+        review = reviews.first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text='Комментарий ' * 20)
+            for _ in range(count)
+        )
+        return (
+            (
+                'Произведения',
+                ReadOnlyTitleSerializer,
+                Title.objects.filter(category=category),
+                ('category',),
+                ('genre',),
+            ),
+            (
+                'Отзывы',
+                ReviewSerializer,
+                reviews,
+                ('author',),
+                (),
+            ),
+            (
+                'Комментарии',
+                CommentSerializer,
+                Comment.objects.filter(review=review),
+                ('author',),
+                (),
+            ),
+        )
+
+    def best_time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return max(best, 1e-9)
+
+    def handle(self, *args, **options):
+        count = options['objects']
+        repeat = options['repeat']
+        with transaction.atomic():
+            for name, serializer_class, queryset, select, prefetch in (
+                self.create_objects(count)
+            ):
+                compiled = compile_serializer(serializer_class)
+                drf_time = self.best_time(
+                    lambda: serializer_class(
+                        queryset.select_related(*select).prefetch_related(
+                            *prefetch
+                        ),
+                        many=True,
+                    ).data,
+                    repeat,
+                )
+                values_time = self.best_time(
+                    lambda: compiled.render(compiled.values(queryset)),
+                    repeat,
+                )
+                self.stdout.write(
+                    f'{name}: DRF {count / drf_time:.0f} объектов/с, '
+                    f'values() {count / values_time:.0f} объектов/с, '
+                    f'быстрее в {drf_time / values_time:.1f} раз'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,99 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.sqlite import STOCK_PRAGMAS, apply_pragmas, get_profile
+from reviews.models import Category, Review, Title
+from users.models import User
+
+BENCH_PREFIX = 'bench-sqlite'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость чтения и записи через API с настройками '
+        'соединения Django по умолчанию и с профилем SQLITE_PRAGMAS. '
+        'Тестовые данные удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов чтения и записи для каждого профиля',
+        )
+
+    def create_objects(self, count):
+        category = Category.objects.create(
+            name=BENCH_PREFIX, slug=BENCH_PREFIX
+        )
+        Title.objects.bulk_create(
+            Title(name=f'{BENCH_PREFIX} {index}', year=2000, category=category)
+            for index in range(count)
+        )
+        user = User.objects.create(
+            username=BENCH_PREFIX, email=f'{BENCH_PREFIX}@yamdb.fake'
+        )
+        return user, list(
+            Title.objects.filter(category=category).values_list(
+                'pk', flat=True
+            )
+        )
+
+    def rate(self, client, method, urls, expected_status, **kwargs):
+        started = time.perf_counter()
+        for url in urls:
+            response = getattr(client, method)(url, **kwargs)
+            if response.status_code != expected_status:
+                raise CommandError(
+                    f'{method.upper()} {url}: {response.status_code}'
+                )
+        return len(urls) / max(time.perf_counter() - started, 1e-9)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        if connection.in_atomic_block:
+            raise CommandError(
+                'Режим журнала нельзя изменить внутри транзакции.'
+            )
+        profiles = (
+            ('Настройки по умолчанию', STOCK_PRAGMAS),
+            ('SQLITE_PRAGMAS', {**STOCK_PRAGMAS, **get_profile()}),
+        )
+        user, title_ids = self.create_objects(options['requests'])
+        client = APIClient()
+        client.force_authenticate(user)
+        try:
+            with override_settings(API_RESPONSE_CACHE={'ENABLED': False}):
+                for name, profile in profiles:
+                    applied = apply_pragmas(connection, profile)
+                    read_rate = self.rate(
+                        client,
+                        'get',
+                        [f'/api/v1/titles/{pk}/' for pk in title_ids],
+                        200,
+                    )
+                    write_rate = self.rate(
+                        client,
+                        'post',
+                        [f'/api/v1/titles/{pk}/reviews/' for pk in title_ids],
+                        201,
+                        data={'text': 'Отзыв', 'score': 5},
+                    )
+                    Review.objects.filter(author=user).delete()
+                    self.stdout.write(
+                        f'{name} (journal_mode={applied["journal_mode"]}, '
+                        f'synchronous={applied["synchronous"]}): '
+                        f'чтение {read_rate:.0f} запросов/с, '
+                        f'запись {write_rate:.0f} запросов/с'
+                    )
+        finally:
+            apply_pragmas(connection, {**STOCK_PRAGMAS, **get_profile()})
+            Title.objects.filter(name__startswith=BENCH_PREFIX).delete()
+            Category.objects.filter(slug=BENCH_PREFIX).delete()
+            User.objects.filter(username=BENCH_PREFIX).delete()
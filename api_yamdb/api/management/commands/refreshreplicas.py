@@ -0,0 +1,47 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from api.replicas import get_replicas, refresh_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу данных SQLite в реплики для чтения через '
+        'sqlite backup API'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а обновлять реплики каждые --interval '
+                 'секунд',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между обновлениями реплик в секундах',
+        )
+
+    def handle(self, *args, **options):
+        aliases = get_replicas()
+        if not aliases:
+            raise CommandError('Реплики не настроены в API_REPLICAS.')
+        while True:
+            for alias in aliases:
+                started = time.perf_counter()
+                try:
+                    refresh_replica(alias)
+                except ImproperlyConfigured as error:
+                    raise CommandError(error)
+                if not options['loop'] or options['verbosity'] > 1:
+                    self.stdout.write(
+                        f'{alias}: обновлена за '
+                        f'{time.perf_counter() - started:.2f} с'
+                    )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
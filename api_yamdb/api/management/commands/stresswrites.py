@@ -0,0 +1,162 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import override_settings
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from reviews.models import Category, Title
+from users.models import User
+
+STRESS_PREFIX = 'stress-writes'
+
+# settings.API_WRITES of compared modes
+MODES = (
+    (
+        'Без координации',
+        {'IMMEDIATE': False, 'RETRIES': 0, 'QUEUE': False},
+    ),
+    (
+        'BEGIN IMMEDIATE и повторы',
+        {'IMMEDIATE': True, 'QUEUE': False},
+    ),
+    (
+        'BEGIN IMMEDIATE, повторы и очередь',
+        {'IMMEDIATE': True, 'QUEUE': True},
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает API одновременной записью отзывов и комментариев из '
+        'нескольких потоков и сравнивает скорость записи и долю ошибок '
+        'без координации записи и с ней. Тестовые данные удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Количество потоков',
+        )
+        parser.add_argument(
+            '--writes',
+            type=int,
+            default=20,
+            help='Количество отзывов каждого потока, к каждому отзыву '
+                 'добавляется комментарий',
+        )
+        parser.add_argument(
+            '--busy-timeout',
+            type=int,
+            default=100,
+            help='Сколько миллисекунд соединение ждет блокировку БД',
+        )
+
+    def create_objects(self, mode_index, threads, writes):
+        prefix = f'{STRESS_PREFIX}-{mode_index}'
+        category = Category.objects.create(name=prefix, slug=prefix)
+        titles = [
+            Title.objects.create(
+                name=f'{prefix} {index}', year=2000, category=category
+            )
+            for index in range(writes)
+        ]
+        users = [
+            User.objects.create(
+                username=f'{prefix}-{index}',
+                email=f'{prefix}-{index}@yamdb.fake',
+            )
+            for index in range(threads)
+        ]
+        return titles, users
+
+    def post(self, user, path, data):
+        # views are called directly: exceptions of the test client are
+        # collected through a global signal and mixed up between threads
+        request = APIRequestFactory().post(path, data, format='json')
+        force_authenticate(request, user=user)
+        match = resolve(path)
+        return match.func(request, *match.args, **match.kwargs)
+
+    def write(self, user, titles, busy_timeout, results):
+        ok = errors = 0
+        try:
+            connection.ensure_connection()
+            if connection.vendor == 'sqlite':
+                connection.connection.execute(
+                    f'PRAGMA busy_timeout = {busy_timeout}'
+                )
+            for title in titles:
+                url = f'/api/v1/titles/{title.pk}/reviews/'
+                try:
+                    response = self.post(
+                        user, url, {'text': 'Отзыв', 'score': 5}
+                    )
+                except Exception:
+                    errors += 2
+                    continue
+                if response.status_code != 201:
+                    errors += 2
+                    continue
+                ok += 1
+                try:
+                    response = self.post(
+                        user,
+                        f'{url}{response.data["id"]}/comments/',
+                        {'text': 'Комментарий'},
+                    )
+                except Exception:
+                    errors += 1
+                    continue
+                if response.status_code == 201:
+                    ok += 1
+                else:
+                    errors += 1
+        finally:
+            connections.close_all()
+            results.append((ok, errors))
+
+    def run_mode(self, mode_index, threads, writes, busy_timeout):
+        titles, users = self.create_objects(mode_index, threads, writes)
+        results = []
+        workers = [
+            threading.Thread(
+                target=self.write,
+                args=(user, titles, busy_timeout, results),
+            )
+            for user in users
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        ok = sum(result[0] for result in results)
+        errors = sum(result[1] for result in results)
+        return ok, errors, elapsed
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        writes = options['writes']
+        try:
+            for mode_index, (name, mode) in enumerate(MODES):
+                with override_settings(API_WRITES=mode):
+                    ok, errors, elapsed = self.run_mode(
+                        mode_index, threads, writes, options['busy_timeout']
+                    )
+                total = ok + errors
+                self.stdout.write(
+                    f'{name}: {ok / elapsed:.0f} записей/с, '
+                    f'ошибок {errors} из {total} '
+                    f'({errors / max(total, 1):.1%})'
+                )
+        finally:
+            Title.objects.filter(name__startswith=STRESS_PREFIX).delete()
+            Category.objects.filter(slug__startswith=STRESS_PREFIX).delete()
+            User.objects.filter(username__startswith=STRESS_PREFIX).delete()
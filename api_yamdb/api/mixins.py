@@ -1,4 +1,13 @@
-from rest_framework import mixins, viewsets
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from rest_framework import mixins, serializers, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from . import cache, replicas
+from .values import compile_serializer
+from .writes import run_write
 
 
 class ListCreateDestroyViewSet(
@@ -12,3 +21,247 @@ class ListCreateDestroyViewSet(
     """
 
     pass
+
+
+class CachedListMixin:
+    """
+    Caches responses of list action and supports conditional requests.
+
+    Cache key contains versions of `cache_namespaces`, that are bumped by
+    signals on writes to the relevant models, so a stale page is never
+    served after the write is committed. The same versions give ETag and
+    Last-Modified headers, so requests with If-None-Match or
+    If-Modified-Since get 304 without running the query and serializer.
+    """
+
+    cache_namespaces = ()
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+        versions = cache.get_versions(self.get_cache_namespaces())
+        replicas.check_replica(versions)
+        key = cache.response_cache_key(request, versions)
+        etag = cache.get_etag(key)
+        last_modified = cache.get_last_modified(versions)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            not_modified['Last-Modified'] = http_date(last_modified)
+            return not_modified
+
+        response = None
+        if cache.get_setting('ENABLED'):
+            cached = cache.get_cache().get(key)
+            if cached is not None:
+                data, status = cached
+                response = Response(data, status=status)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if (
+                cache.get_setting('ENABLED')
+                and response.status_code == 200
+            ):
+                cache.get_cache().set(
+                    key,
+                    (response.data, response.status_code),
+                    cache.get_setting('TIMEOUT'),
+                )
+        if response.status_code == 200:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CachedResponseMixin(CachedListMixin):
+    """
+    Caches responses of list and retrieve actions.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CoordinatedWriteMixin:
+    """
+    Runs create, update and destroy actions through run_write: in
+    BEGIN IMMEDIATE transaction that is retried when the database is
+    locked. Actions are retried from validation, request data is parsed
+    once and reused.
+    """
+
+    def create(self, request, *args, **kwargs):
+        return run_write(lambda: super(CoordinatedWriteMixin, self).create(
+            request, *args, **kwargs
+        ))
+
+    def update(self, request, *args, **kwargs):
+        return run_write(lambda: super(CoordinatedWriteMixin, self).update(
+            request, *args, **kwargs
+        ))
+
+    def destroy(self, request, *args, **kwargs):
+        return run_write(lambda: super(CoordinatedWriteMixin, self).destroy(
+            request, *args, **kwargs
+        ))
+
+
+class ReplicaReadMixin:
+    """
+    Sends reads of safe requests to a read replica, see api/replicas.py.
+    A user who wrote through the API reads from the primary for
+    STICKY_SECONDS, so they see their own writes.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.read_alias_token = replicas.read_alias.set(
+            replicas.choose_replica(request)
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'read_alias_token', None)
+        if token is not None:
+            replicas.read_alias.reset(token)
+            self.read_alias_token = None
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            replicas.stick_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class SparseFieldsetMixin:
+    """
+    Limits fields of list and retrieve responses with `?fields=` and
+    `?omit=` query parameters (comma separated field names).
+
+    Requested fields also drive the queryset: model columns that are not
+    needed for them are deferred, and relations from
+    `sparse_select_related` and `sparse_prefetch_related` are fetched only
+    when their field is requested.
+    """
+
+    sparse_actions = ('list', 'retrieve')
+    # serializer field -> model columns it is rendered from, by default
+    # the column with the same name as the field
+    sparse_field_columns = {}
+    # columns fetched regardless of fields, e.g. foreign key to the parent
+    # object that related manager sets on every fetched object
+    sparse_required_columns = ()
+    # serializer field -> relation fetched with objects
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    @staticmethod
+    def _split(value):
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_sparse_fields_available(self):
+        serializer = self.get_serializer_class()()
+        return [
+            name for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+    @cached_property
+    def sparse_fieldset(self):
+        """
+        Returns requested field names or None if all fields are rendered.
+        """
+        params = self.request.query_params
+        if self.action not in self.sparse_actions or (
+            'fields' not in params and 'omit' not in params
+        ):
+            return None
+        available = self.get_sparse_fields_available()
+        fields = self._split(params.get('fields', '')) or available
+        omit = self._split(params.get('omit', ''))
+        unknown = set(fields + omit) - set(available)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}.']
+            })
+        return [
+            name for name in available if name in fields and name not in omit
+        ]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['sparse_fieldset'] = self.sparse_fieldset
+        return context
+
+    def get_sparse_columns(self):
+        columns = set(self.sparse_required_columns)
+        columns.update(
+            field.lstrip('-')
+            for field in getattr(self, 'cursor_ordering', ())
+        )
+        for name in self.sparse_fieldset:
+            columns.update(self.sparse_field_columns.get(name, (name,)))
+        return columns
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.sparse_actions:
+            return queryset
+        fieldset = self.sparse_fieldset
+        if fieldset is not None:
+            columns = self.get_sparse_columns()
+            queryset = queryset.defer(*(
+                field.name for field in queryset.model._meta.concrete_fields
+                if not field.primary_key and field.name not in columns
+            ))
+        select_related = [
+            relation for name, relation in self.sparse_select_related.items()
+            if fieldset is None or name in fieldset
+        ]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetch_related = [
+            relation
+            for name, relation in self.sparse_prefetch_related.items()
+            if fieldset is None or name in fieldset
+        ]
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class ValuesListMixin:
+    """
+    Renders list responses from values() rows with serializer compiled by
+    `compile_serializer` instead of model instances and DRF serializer
+    fields. Response data is the same as with `get_serializer_class()`.
+    """
+
+    values_list = True
+
+    def list(self, request, *args, **kwargs):
+        if not self.values_list:
+            return super().list(request, *args, **kwargs)
+        compiled = compile_serializer(
+            self.get_serializer_class(), getattr(self, 'sparse_fieldset', None)
+        )
+        rows = compiled.values(
+            self.filter_queryset(self.get_queryset()),
+            *(
+                field.lstrip('-')
+                for field in getattr(self, 'cursor_ordering', ())
+            ),
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.render(page))
+        return Response(compiled.render(rows))
@@ -0,0 +1,199 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination which keeps position as values of all ordering fields
+    of the last item on the page.
+
+    Unlike DRF CursorPagination, that uses only the first ordering field
+    and an offset for items with equal values, here the next page is
+    selected with a row-value comparison over the whole ordering, so
+    with a matching index any page costs the same as the first one.
+    Ordering must end with a unique field (usually id).
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = has_more if reverse else position is not None
+        self.next_position = (
+            self._position(results[-1]) if has_next and results else None
+        )
+        self.previous_position = (
+            self._position(results[0]) if has_previous and results else None
+        )
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')))
+            values = cursor['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._field(name).to_python(value)
+                for name, value in zip(self._names(), values)
+            ]
+            return position, bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        encoded = b64encode(json.dumps(cursor).encode('ascii'))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode('ascii')
+        )
+
+    def _names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def _field(self, name):
+        return self.model._meta.get_field(name)
+
+    def _position(self, obj):
+        if isinstance(obj, dict):
+            # values() row
+            obj = SimpleNamespace(**{
+                self._field(name).attname: obj[name]
+                for name in self._names()
+            })
+        return [
+            self._field(name).value_to_string(obj) for name in self._names()
+        ]
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _after(ordering, position):
+        """
+        Builds (a, b, c) > (x, y, z) condition respecting direction of
+        every ordering field.
+        """
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': position[index]})
+            for prev_field, value in zip(ordering[:index], position):
+                step &= Q(**{prev_field.lstrip('-'): value})
+            condition |= step
+        return condition
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination by default. Keyset pagination is used when
+    request has `cursor` parameter, `pagination=cursor` parameter or
+    view has `cursor_pagination = True`, unless request has one of view
+    `page_number_params`, that order results by something other than
+    model fields (e.g. relevance of search results).
+
+    Keyset ordering is taken from view `cursor_ordering` attribute or
+    model Meta.ordering with id as a tie-breaker.
+    """
+
+    mode_query_param = 'pagination'
+
+    def use_cursor(self, request, view):
+        if any(
+            param in request.query_params
+            for param in getattr(view, 'page_number_params', ())
+        ):
+            return False
+        return (
+            KeysetPagination.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+            or getattr(view, 'cursor_pagination', False)
+        )
+
+    def get_cursor_ordering(self, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            return ordering
+        ordering = tuple(queryset.model._meta.ordering)
+        if not ordering:
+            return ('id',)
+        tie_breaker = '-id' if ordering[-1].startswith('-') else 'id'
+        return ordering + (tie_breaker,)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if not self.use_cursor(request, view):
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = KeysetPagination(
+            self.get_cursor_ordering(queryset, view)
+        )
+        self.keyset.page_size = self.page_size
+        results = self.keyset.paginate_queryset(queryset, request, view)
+        base_url = remove_query_param(
+            self.keyset.base_url, self.page_query_param
+        )
+        self.keyset.base_url = replace_query_param(
+            base_url, self.mode_query_param, 'cursor'
+        )
+        return results
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
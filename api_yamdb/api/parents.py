@@ -0,0 +1,41 @@
+from django.shortcuts import get_object_or_404
+
+from .batch import get_request_cache
+from reviews.models import Review, Title
+
+
+class ParentResolver:
+    """
+    Loads parent objects of nested routes by `title_id` and `review_id`
+    URL kwargs at most once per request. Objects are kept in the request
+    cache, so view methods, serializer defaults and sub-requests of a
+    batch share them.
+    """
+
+    def __init__(self, request, kwargs):
+        self.cache = get_request_cache(request)
+        self.title_id = kwargs.get('title_id')
+        self.review_id = kwargs.get('review_id')
+
+    def title(self):
+        key = ('title', self.title_id)
+        if key not in self.cache:
+            self.cache[key] = get_object_or_404(Title, pk=self.title_id)
+        return self.cache[key]
+
+    def review(self):
+        """
+        Review is looked up together with title id from the URL, so title
+        itself is not fetched. If it was fetched already, it's attached to
+        the review.
+        """
+        key = ('review', self.title_id, self.review_id)
+        if key not in self.cache:
+            review = get_object_or_404(
+                Review, pk=self.review_id, title_id=self.title_id
+            )
+            title = self.cache.get(('title', self.title_id))
+            if title is not None:
+                review.title = title
+            self.cache[key] = review
+        return self.cache[key]
@@ -0,0 +1,119 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from . import cache
+
+DEFAULTS = {
+    # aliases of DATABASES that are copies of default
+    'ALIASES': (),
+    # users read from the primary for this long after their write
+    'STICKY_SECONDS': 5,
+}
+
+# replica that reads of the current request go to, None for the primary
+read_alias = ContextVar('read_alias', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'API_REPLICAS', {}).get(name, DEFAULTS[name])
+
+
+def get_replicas():
+    return [
+        alias for alias in get_setting('ALIASES')
+        if alias in connections.databases
+    ]
+
+
+def sticky_key(user_id):
+    return f'{cache.get_setting("KEY_PREFIX")}:primary:{user_id}'
+
+
+def refreshed_key(alias):
+    return f'{cache.get_setting("KEY_PREFIX")}:replica:{alias}:refreshed'
+
+
+def stick_to_primary(user):
+    if get_replicas() and user and user.is_authenticated:
+        cache.get_cache().set(
+            sticky_key(user.pk), True, get_setting('STICKY_SECONDS')
+        )
+
+
+def choose_replica(request):
+    """
+    Returns replica for reads of the request or None if they must go to
+    the primary: the request is not safe or the user wrote recently.
+    """
+    aliases = get_replicas()
+    if not aliases or request.method not in SAFE_METHODS:
+        return None
+    user = request.user
+    if user and user.is_authenticated and cache.get_cache().get(
+        sticky_key(user.pk)
+    ):
+        return None
+    return random.choice(aliases)
+
+
+def check_replica(versions):
+    """
+    Sends reads of the request to the primary if its replica was refreshed
+    before the last write to the namespaces of `versions`, so stale data
+    is neither served nor cached under the new versions.
+    """
+    alias = read_alias.get()
+    if alias is None:
+        return
+    refreshed = cache.get_cache().get(refreshed_key(alias))
+    if refreshed is None or refreshed < max(versions):
+        read_alias.set(None)
+
+
+def refresh_replica(alias):
+    """
+    Copies the primary sqlite database into the replica with sqlite backup
+    API. Start time of the copy is stored, writes committed before it are
+    in the replica.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    target = connections[alias]
+    if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+        raise ImproperlyConfigured(
+            'Реплики обновляются только для SQLite.'
+        )
+    started = time.time_ns()
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+    cache.get_cache().set(refreshed_key(alias), started, timeout=None)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica chosen for the current API request (see
+    ReplicaReadMixin) and writes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_setting('ALIASES')}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_setting('ALIASES'):
+            return False
+        return None
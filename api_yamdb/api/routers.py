@@ -0,0 +1,17 @@
+from rest_framework.routers import SimpleRouter
+
+
+class BulkRouter(SimpleRouter):
+    '''
+    Also routes PATCH requests to list url to `bulk_partial_update`
+    action of viewsets that implement it.
+    '''
+    routes = [
+        SimpleRouter.routes[0]._replace(
+            mapping={
+                **SimpleRouter.routes[0].mapping,
+                'patch': 'bulk_partial_update',
+            }
+        ),
+        *SimpleRouter.routes[1:],
+    ]
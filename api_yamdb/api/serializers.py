@@ -1,13 +1,125 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from .signals import invalidate_instances
+from .slugs import resolve_slugs
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from reviews.validators import validate_not_future_year
 from users.models import User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class SparseFieldsetSerializerMixin:
+    '''
+    Renders only fields listed in `sparse_fieldset` of serializer context
+    (see SparseFieldsetMixin of views). Nested serializers are rendered
+    in full.
+    '''
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('sparse_fieldset')
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if fieldset is None or parent is not None:
+            return fields
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if name in fieldset or field.write_only
+        )
+
+
+def constraint_writes_enabled():
+    return getattr(settings, 'API_CONSTRAINT_WRITES', False)
+
+
+def is_unique_validator(validator):
+    return isinstance(validator, (UniqueValidator, UniqueTogetherValidator))
+
+
+class ConstraintWriteSerializerMixin:
+    '''
+    With settings.API_CONSTRAINT_WRITES unique validators are not run
+    before save: the row is written in a savepoint and duplicates are
+    rejected by unique constraints of the database, which also closes the
+    race between check and insert. Skipped validators are run only after
+    IntegrityError, so the client gets the same validation errors.
+    '''
+
+    def get_fields(self):
+        fields = super().get_fields()
+        self.unique_field_validators = {}
+        if not constraint_writes_enabled():
+            return fields
+        for name, field in fields.items():
+            validators = [
+                validator for validator in field.validators
+                if is_unique_validator(validator)
+            ]
+            if validators:
+                self.unique_field_validators[name] = validators
+                field.validators = [
+                    validator for validator in field.validators
+                    if not is_unique_validator(validator)
+                ]
+        return fields
+
+    def get_validators(self):
+        validators = super().get_validators()
+        self.unique_validators = []
+        if not constraint_writes_enabled():
+            return validators
+        self.unique_validators = [
+            validator for validator in validators
+            if is_unique_validator(validator)
+        ]
+        return [
+            validator for validator in validators
+            if not is_unique_validator(validator)
+        ]
+
+    def save(self, **kwargs):
+        if not constraint_writes_enabled():
+            return super().save(**kwargs)
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            self.raise_unique_errors({**self.validated_data, **kwargs})
+            raise
+
+    def raise_unique_errors(self, attrs):
+        errors = {}
+        for name, validators in self.unique_field_validators.items():
+            if name not in attrs:
+                continue
+            try:
+                for validator in validators:
+                    validator(attrs[name], self.fields[name])
+            except serializers.ValidationError as exc:
+                errors[name] = exc.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        try:
+            for validator in self.unique_validators:
+                validator(attrs, self)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError(
+                detail=serializers.as_serializer_error(exc)
+            )
+
+
+class CategorySerializer(SparseFieldsetSerializerMixin,
+                         ConstraintWriteSerializerMixin,
+                         serializers.ModelSerializer):
 
     slug = serializers.SlugField(
         max_length=50,
@@ -27,7 +139,9 @@ class CategorySerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetSerializerMixin,
+                      ConstraintWriteSerializerMixin,
+                      serializers.ModelSerializer):
 
     slug = serializers.SlugField(
         max_length=50,
@@ -47,7 +161,8 @@ class GenreSerializer(serializers.ModelSerializer):
         )
 
 
-class ReadOnlyTitleSerializer(serializers.ModelSerializer):
+class ReadOnlyTitleSerializer(SparseFieldsetSerializerMixin,
+                              serializers.ModelSerializer):
     rating = serializers.IntegerField()
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
@@ -65,11 +180,192 @@ class ReadOnlyTitleSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    '''
+    Resolves slugs through the in-process slug cache, see resolve_slugs.
+    With many=True all submitted slugs are resolved at once and every
+    unknown slug is reported.
+
+    Objects fetched for the whole list of items by TitleListSerializer are
+    taken from `prefetched_slugs` of serializer context.
+    '''
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManyCachedSlugRelatedField(**list_kwargs)
+
+    def resolve(self, slugs):
+        queryset = self.get_queryset()
+        prefetched = self.context.get('prefetched_slugs', {}).get(
+            queryset.model
+        )
+        if prefetched is not None:
+            return prefetched
+        return resolve_slugs(queryset, self.slug_field, slugs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        try:
+            return self.resolve([data])[data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+
+
+class ManyCachedSlugRelatedField(serializers.ManyRelatedField):
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        relation = self.child_relation
+        if not all(isinstance(slug, str) for slug in data):
+            relation.fail('invalid')
+        objects = relation.resolve(data)
+        unknown = [slug for slug in dict.fromkeys(data) if slug not in objects]
+        if unknown:
+            raise serializers.ValidationError([
+                relation.error_messages['does_not_exist'].format(
+                    slug_name=relation.slug_field, value=slug
+                )
+                for slug in unknown
+            ])
+        return [objects[slug] for slug in data]
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    '''
+    Creates and updates titles in bulk: slugs are resolved with one query
+    per model, uniqueness is checked with one query for all items, titles
+    and their genres are written with bulk queries.
+    '''
+    unique_fields = ('name', 'year', 'category')
+
+    def prefetch_slugs(self, data):
+        prefetched = {}
+        for name, field in self.child.fields.items():
+            relation = getattr(field, 'child_relation', field)
+            if field.read_only or not isinstance(
+                relation, CachedSlugRelatedField
+            ):
+                continue
+            slugs = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                for slug in value if isinstance(value, list) else [value]:
+                    if isinstance(slug, str):
+                        slugs.add(slug)
+            queryset = relation.get_queryset()
+            prefetched[queryset.model] = resolve_slugs(
+                queryset, relation.slug_field, slugs
+            )
+        return prefetched
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.context['prefetched_slugs'] = self.prefetch_slugs(data)
+        items = super().to_internal_value(data)
+        self.validate_unique(items)
+        return items
+
+    def validate_unique(self, items):
+        instances = self.instance or [None] * len(items)
+        keys = [
+            (
+                item.get('name', getattr(instance, 'name', None)),
+                item.get('year', getattr(instance, 'year', None)),
+                getattr(
+                    item.get('category', getattr(instance, 'category', None)),
+                    'pk',
+                    None,
+                ),
+            )
+            for item, instance in zip(items, instances)
+        ]
+        existing = set(
+            Title.objects.filter(
+                name__in={key[0] for key in keys},
+                year__in={key[1] for key in keys},
+            ).exclude(
+                pk__in=[instance.pk for instance in instances if instance]
+            ).values_list('name', 'year', 'category')
+        )
+        errors = []
+        for key in keys:
+            if None not in key and key in existing:
+                errors.append({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Такое произведение уже существует в БД'
+                    ]
+                })
+            else:
+                errors.append({})
+            existing.add(key)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+    def set_genres(self, titles, genres):
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, title_genres in zip(titles, genres)
+            for genre in dict.fromkeys(title_genres)
+        )
+
+    def fetch_pks(self, titles):
+        # SQLite doesn't return primary keys of rows created by bulk_create
+        if all(title.pk for title in titles):
+            return
+        pks = {
+            (name, year, category_id): pk
+            for name, year, category_id, pk in Title.objects.filter(
+                name__in={title.name for title in titles},
+                year__in={title.year for title in titles},
+            ).values_list('name', 'year', 'category', 'pk')
+        }
+        for title in titles:
+            title.pk = pks[(title.name, title.year, title.category_id)]
+
+    def create(self, validated_data):
+        genres = [item.pop('genre', []) for item in validated_data]
+        titles = [Title(**item) for item in validated_data]
+        with transaction.atomic():
+            Title.objects.bulk_create(titles)
+            self.fetch_pks(titles)
+            self.set_genres(titles, genres)
+            invalidate_instances(Title, titles)
+        prefetch_related_objects(titles, 'genre')
+        return titles
+
+    def update(self, instances, validated_data):
+        fields = set()
+        updated_genres = {}
+        for instance, item in zip(instances, validated_data):
+            if 'genre' in item:
+                updated_genres[instance] = item.pop('genre')
+            for attr, value in item.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+        with transaction.atomic():
+            if fields:
+                Title.objects.bulk_update(instances, fields)
+            if updated_genres:
+                GenreTitle.objects.filter(title__in=updated_genres).delete()
+                self.set_genres(updated_genres, updated_genres.values())
+            invalidate_instances(Title, instances)
+        prefetch_related_objects(instances, 'genre')
+        return instances
+
+
+class TitleSerializer(ConstraintWriteSerializerMixin,
+                      serializers.ModelSerializer):
+    genre = CachedSlugRelatedField(
         many=True, slug_field='slug', queryset=Genre.objects.all()
     )
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
         slug_field='slug', queryset=Category.objects.all()
     )
 
@@ -92,6 +388,13 @@ class TitleSerializer(serializers.ModelSerializer):
                 message='Такое произведение уже существует в БД',
             )
         ]
+        list_serializer_class = TitleListSerializer
+
+    def get_validators(self):
+        if isinstance(self.parent, TitleListSerializer):
+            # uniqueness of list items is checked by the list serializer
+            return []
+        return super().get_validators()
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -143,7 +446,8 @@ class ObtainTokenSerializer(serializers.Serializer):
         return data
 
 
-class UsersManageSerializer(serializers.ModelSerializer):
+class UsersManageSerializer(SparseFieldsetSerializerMixin,
+                            serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -174,13 +478,12 @@ class CreateTitleDefault(object):
     requires_context = True
 
     def __call__(self, serializer_field):
-        view = serializer_field.context['view']
-        title_id = view.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        return title
+        return serializer_field.context['view'].get_title()
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetSerializerMixin,
+                       ConstraintWriteSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -201,7 +504,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         ]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
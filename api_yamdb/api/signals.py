@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from . import authentication, slugs, sqlite
+from .cache import GLOBAL_NAMESPACE, bump_versions, invalidate
+from .tokens import forget_role_versions
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+
+def title_namespaces(title_id):
+    return ('title', f'title:{title_id}')
+
+
+def review_namespaces(review):
+    # review writes change title rating as well
+    return (
+        ('review', f'title:{review.title_id}:reviews')
+        + title_namespaces(review.title_id)
+    )
+
+
+# cache namespaces bumped on writes to the model
+CACHE_NAMESPACES = {
+    Category: lambda category: ('category',),
+    Genre: lambda genre: ('genre',),
+    Title: lambda title: (
+        title_namespaces(title.pk) + (f'title:{title.pk}:reviews',)
+    ),
+    GenreTitle: lambda genre_title: title_namespaces(genre_title.title_id),
+    Review: lambda review: (
+        review_namespaces(review) + (f'review:{review.pk}:comments',)
+    ),
+    Comment: lambda comment: (
+        'comment', f'review:{comment.review_id}:comments'
+    ),
+    User: lambda user: ('user',),
+}
+
+
+def invalidate_instances(model, instances):
+    """
+    Invalidates cached responses after bulk writes, that don't send
+    model signals.
+    """
+    namespaces = set()
+    for instance in instances:
+        namespaces.update(CACHE_NAMESPACES[model](instance))
+    invalidate(*namespaces)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    get_namespaces = CACHE_NAMESPACES.get(sender)
+    if get_namespaces:
+        invalidate(*get_namespaces(instance))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drops cached user and role version now and once more after commit,
+    so a request that read the user before commit doesn't keep the old
+    role.
+    """
+    usernames = {instance.username}
+    usernames.add(getattr(instance, '_loaded_username', instance.username))
+
+    def forget():
+        authentication.invalidate_user(instance)
+        forget_role_versions(*usernames)
+    forget()
+    transaction.on_commit(forget)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_cached_slugs(sender, instance, **kwargs):
+    # pk of deleted instance is reset before commit
+    pk = instance.pk
+    slugs.invalidate_slugs(sender, pk)
+    transaction.on_commit(lambda: slugs.invalidate_slugs(sender, pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate(*title_namespaces(instance.pk))
+        return
+    namespaces = {'title'}
+    for title_id in pk_set or ():
+        namespaces.update(title_namespaces(title_id))
+    invalidate(*namespaces)
+
+
+@receiver(post_migrate)
+def invalidate_after_migrate(sender, **kwargs):
+    """
+    migrate and flush change tables without model signals.
+    """
+    if sender.name == 'reviews':
+        bump_versions(GLOBAL_NAMESPACE)
+        slugs.slug_cache.clear()
+    if sender.name == 'users':
+        authentication.user_cache.clear()
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    sqlite.configure_connection(connection)
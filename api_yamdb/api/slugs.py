@@ -0,0 +1,53 @@
+from django.conf import settings
+
+from .cache import LRUCache
+
+DEFAULTS = {
+    'MAXSIZE': 10000,
+    # slugs may be changed without signals (bulk import, other processes),
+    # so cached ids are refreshed after the timeout
+    'TIMEOUT': 60 * 5,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_SLUG_CACHE', {}).get(name, DEFAULTS[name])
+
+
+# (model label, id) by (model label, slug field, slug)
+slug_cache = LRUCache(get_setting('MAXSIZE'), get_setting('TIMEOUT'))
+
+
+def resolve_slugs(queryset, slug_field, slugs):
+    """
+    Returns dict of objects by slug, unknown slugs are left out. Ids of
+    known slugs are taken from the in-process cache, the rest are fetched
+    with one query. Objects have only id and slug loaded, other fields
+    are deferred.
+    """
+    model = queryset.model
+    label = model._meta.label
+    ids = {}
+    missing = []
+    for slug in dict.fromkeys(slugs):
+        cached = slug_cache.get((label, slug_field, slug))
+        if cached is None:
+            missing.append(slug)
+        else:
+            ids[slug] = cached[1]
+    if missing:
+        for slug, pk in queryset.filter(
+            **{f'{slug_field}__in': missing}
+        ).values_list(slug_field, 'pk'):
+            slug_cache.set((label, slug_field, slug), (label, pk))
+            ids[slug] = pk
+    field_names = [model._meta.pk.attname, slug_field]
+    return {
+        slug: model.from_db(queryset.db, field_names, [pk, slug])
+        for slug, pk in ids.items()
+    }
+
+
+def invalidate_slugs(model, pk):
+    key = (model._meta.label, pk)
+    slug_cache.delete_where(lambda value: value == key)
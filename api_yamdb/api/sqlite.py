@@ -0,0 +1,93 @@
+import logging
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+# pragmas that can be set by settings.SQLITE_PRAGMAS in the order they are
+# applied: busy_timeout goes first, so switching to WAL waits for the lock
+PRAGMAS = (
+    'busy_timeout',
+    'journal_mode',
+    'synchronous',
+    'cache_size',
+    'mmap_size',
+    'temp_store',
+)
+
+# settings of a connection opened by Django with Python sqlite3 module, used
+# by benchsqlite to compare with the configured profile; busy_timeout is the
+# default 5 s timeout of sqlite3.connect, sqlite itself defaults to 0
+STOCK_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'cache_size': -2000,
+    'mmap_size': 0,
+    'temp_store': 'default',
+}
+
+# values read back from the first connection of every alias
+applied_profiles = {}
+
+
+def get_profile():
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def format_value(name, value):
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or (
+        isinstance(value, str) and not re.fullmatch(r'[A-Za-z]+', value)
+    ):
+        raise ImproperlyConfigured(
+            f'Недопустимое значение {value!r} для PRAGMA {name}.'
+        )
+    return str(value)
+
+
+def apply_pragmas(connection, profile):
+    """
+    Sets pragmas of the profile on the sqlite connection and returns their
+    values read back from the database. Values may differ from requested
+    ones, e.g. in-memory databases stay in `memory` journal mode.
+    """
+    unknown = set(profile) - set(PRAGMAS)
+    if unknown:
+        raise ImproperlyConfigured(
+            'Неизвестные PRAGMA в SQLITE_PRAGMAS: '
+            + ', '.join(sorted(unknown))
+        )
+    applied = {}
+    with connection.cursor() as cursor:
+        for name in PRAGMAS:
+            if name not in profile:
+                continue
+            cursor.execute(
+                f'PRAGMA {name} = {format_value(name, profile[name])}'
+            )
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            # mmap_size of in-memory databases is not reported
+            applied[name] = row[0] if row else None
+    return applied
+
+
+def configure_connection(connection):
+    """
+    Applies settings.SQLITE_PRAGMAS to every new sqlite connection. The
+    profile of the first connection of every alias is logged and kept in
+    applied_profiles.
+    """
+    profile = get_profile()
+    if connection.vendor != 'sqlite' or not profile:
+        return
+    applied = apply_pragmas(connection, profile)
+    if connection.alias not in applied_profiles:
+        applied_profiles[connection.alias] = applied
+        logger.info(
+            'SQLite %s: %s',
+            connection.alias,
+            ', '.join(f'{name}={value}' for name, value in applied.items()),
+        )
@@ -0,0 +1,100 @@
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .cache import GLOBAL_NAMESPACE, get_cache, get_setting, version_key
+from users.models import User
+
+ROLE_CLAIMS = ('uid', 'role', 'is_superuser', 'role_version')
+
+
+def role_tokens_enabled():
+    return getattr(settings, 'API_ROLE_TOKENS', False)
+
+
+class RoleAccessToken(AccessToken):
+    """
+    Access token that also carries user id, role, superuser flag and role
+    version, so permissions of read requests are checked without loading
+    the user.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['uid'] = user.pk
+        token['role'] = user.role
+        token['is_superuser'] = user.is_superuser
+        token['role_version'] = user.role_version
+        return token
+
+
+def issue_access_token(user):
+    if role_tokens_enabled():
+        return RoleAccessToken.for_user(user)
+    return RefreshToken.for_user(user).access_token
+
+
+def is_role_token(token):
+    return all(claim in token for claim in ROLE_CLAIMS)
+
+
+class ClaimsUser:
+    """
+    Authenticated user built from claims of RoleAccessToken. It has
+    everything permissions need, but it's not a model instance and can't
+    be saved or assigned to foreign keys.
+    """
+
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+    is_staff = False
+
+    def __init__(self, token):
+        self.pk = self.id = token['uid']
+        self.username = token[api_settings.USER_ID_CLAIM]
+        self.role = token['role']
+        self.is_superuser = token['is_superuser']
+        self.role_version = token['role_version']
+
+    def __str__(self):
+        return self.username
+
+    def __eq__(self, other):
+        return isinstance(other, (User, ClaimsUser)) and other.pk == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+def role_version_key(username):
+    return f'{get_setting("KEY_PREFIX")}:role_version:{username}'
+
+
+def get_role_version(username):
+    """
+    Returns current role version of the user or None if there is no such
+    user. Versions are cached together with the global cache version,
+    which is bumped after flush, so versions of users removed by flush are
+    never reused.
+    """
+    cache = get_cache()
+    global_key = version_key(GLOBAL_NAMESPACE)
+    key = role_version_key(username)
+    cached = cache.get_many([global_key, key])
+    generation = cached.get(global_key)
+    if key in cached and generation is not None:
+        cached_generation, version = cached[key]
+        if cached_generation == generation:
+            return version
+    version = User.objects.filter(username=username).values_list(
+        'role_version', flat=True
+    ).first()
+    if generation is not None:
+        cache.set(key, (generation, version), None)
+    return version
+
+
+def forget_role_versions(*usernames):
+    get_cache().delete_many([role_version_key(name) for name in usernames])
@@ -1,13 +1,14 @@
 from django.urls import include, path
-from rest_framework.routers import SimpleRouter
 
+from .batch import batch
+from .routers import BulkRouter
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
                     obtain_token, RegisterViewSet, ReviewViewSet,
                     TitleViewSet, UsersManageViewSet)
 
 app_name = 'api'
 
-router_v1 = SimpleRouter()
+router_v1 = BulkRouter()
 
 router_v1.register('auth/signup', RegisterViewSet, basename='register')
 router_v1.register('users', UsersManageViewSet, basename='users')
@@ -28,4 +29,5 @@ router_v1.register(
 urlpatterns = [
     path('v1/', include(router_v1.urls), name='api'),
     path('v1/auth/token/', obtain_token, name='token'),
+    path('v1/batch/', batch, name='batch'),
 ]
@@ -0,0 +1,134 @@
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import ManyToManyField
+from rest_framework import serializers
+
+# fields that render values of their model columns as they are
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+class CompiledSerializer:
+    """
+    Renders values() rows into the same data as `serializer_class` renders
+    model instances.
+
+    Serializer fields are inspected once: every field becomes a getter of
+    a values() column, so a row is rendered with a few dict lookups instead
+    of binding DRF fields and calling to_representation of every field.
+    Supported fields are model columns, SlugRelatedField over a foreign
+    key and nested model serializers over a foreign key or many-to-many
+    field. Nested many-to-many objects are fetched with one query for all
+    rendered rows.
+    """
+
+    def __init__(self, serializer_class, fieldset=None):
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        self.columns = ['pk']
+        self.getters = []
+        self.many = []
+        for name, field in serializer.fields.items():
+            if field.write_only or (
+                fieldset is not None and name not in fieldset
+            ):
+                continue
+            self.getters.append((name, self.compile_field(name, field)))
+
+    def compile_field(self, name, field, prefix=''):
+        source = prefix + field.source.replace('.', '__')
+        if isinstance(field, serializers.ListSerializer):
+            return self.compile_many(name, field.child, source)
+        if isinstance(field, serializers.ModelSerializer):
+            return self.compile_nested(field, source)
+        if isinstance(field, serializers.SlugRelatedField):
+            key = f'{source}__{field.slug_field}'
+            self.columns.append(key)
+            return lambda row, related: row[key]
+        if isinstance(field, (
+            serializers.RelatedField,
+            serializers.ManyRelatedField,
+            serializers.Serializer,
+        )) or field.source == '*':
+            raise ImproperlyConfigured(
+                f'Field {name} of {type(field.parent).__name__} '
+                'can\'t be rendered from values() rows.'
+            )
+        key = 'pk' if source in ('id', 'pk') else source
+        self.columns.append(key)
+        if isinstance(field, IDENTITY_FIELDS):
+            return lambda row, related: row[key]
+        convert = field.to_representation
+        return lambda row, related: (
+            None if row[key] is None else convert(row[key])
+        )
+
+    def compile_nested(self, serializer, source):
+        getters = [
+            (name, self.compile_field(name, field, prefix=f'{source}__'))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+        self.columns.append(source)
+
+        def get_nested(row, related):
+            if row[source] is None:
+                return None
+            return {name: getter(row, related) for name, getter in getters}
+        return get_nested
+
+    def compile_many(self, name, serializer, source):
+        model_field = self.model._meta.get_field(source)
+        if not isinstance(model_field, ManyToManyField):
+            raise ImproperlyConfigured(
+                f'Field {name} must be a many-to-many field to be rendered '
+                'from values() rows.'
+            )
+        child = CompiledSerializer(type(serializer))
+        self.many.append((name, model_field.related_query_name(), child))
+        return lambda row, related: related[name].get(row['pk'], [])
+
+    def values(self, queryset, *extra_columns):
+        """
+        Returns values() queryset with columns needed to render rows.
+        """
+        columns = dict.fromkeys(self.columns + list(extra_columns))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def fetch_many(self, rows):
+        related = {}
+        pks = [row['pk'] for row in rows]
+        for name, query_name, child in self.many:
+            objects = related[name] = {}
+            queryset = child.values(
+                child.model.objects.filter(**{f'{query_name}__in': pks}),
+                query_name,
+            )
+            for row in queryset:
+                objects.setdefault(row[query_name], []).append(
+                    child.render_row(row, None)
+                )
+        return related
+
+    def render_row(self, row, related):
+        return {name: getter(row, related) for name, getter in self.getters}
+
+    def render(self, rows):
+        rows = list(rows)
+        related = self.fetch_many(rows) if self.many and rows else {}
+        return [self.render_row(row, related) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def _compile(serializer_class, fieldset):
+    return CompiledSerializer(serializer_class, fieldset)
+
+
+def compile_serializer(serializer_class, fieldset=None):
+    return _compile(
+        serializer_class, None if fieldset is None else tuple(fieldset)
+    )
@@ -1,30 +1,37 @@
+import json
 import uuid
 
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import (filters, mixins, permissions, serializers, status,
+from rest_framework import (mixins, permissions, serializers, status,
                             viewsets)
 from rest_framework.decorators import action, api_view
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.utils.encoders import JSONEncoder
 
 from api_yamdb.settings import SERVICE_EMAIL
-from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
+from .filters import NameSearchFilter, TitleFilter
+from .mixins import (CachedListMixin, CachedResponseMixin,
+                     CoordinatedWriteMixin, ListCreateDestroyViewSet,
+                     ReplicaReadMixin, SparseFieldsetMixin, ValuesListMixin)
+from .pagination import CursorOrPageNumberPagination
+from .parents import ParentResolver
 from .permissions import AuthorPermission, IsAdminOrReadOnly, IsAdminPermission
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, ObtainTokenSerializer,
                           ReadOnlyTitleSerializer, RegisterSerializer,
                           ReviewSerializer, SelfProfileSerializer,
                           TitleSerializer, UsersManageSerializer)
-from reviews.models import Category, Genre, Review, Title
+from .tokens import issue_access_token
+from .writes import run_write
+from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
+from users.outbox import enqueue_email
 
 
 class RegisterViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
@@ -39,7 +46,7 @@ class RegisterViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     def send_email(self, user):
         confirmation_code = user.confirmation_code
         email = user.email
-        send_mail(
+        enqueue_email(
             'E-mail verification',
             f'Your confirmation_code is {confirmation_code}',
             SERVICE_EMAIL,
@@ -82,15 +89,15 @@ def obtain_token(request):
     serializer.is_valid(raise_exception=True)
     username = serializer.data.get('username')
     user = get_object_or_404(User, username=username)
-    token = RefreshToken.for_user(user).access_token
+    token = issue_access_token(user)
     return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
 
-class UsersManageViewSet(viewsets.ModelViewSet):
+class UsersManageViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UsersManageSerializer
     lookup_field = 'username'
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOrPageNumberPagination
     permission_classes = (IsAuthenticated, IsAdminPermission)
 
     def perform_create(self, serializer):
@@ -115,74 +122,203 @@ class UsersManageViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class SlugNameViewSet(ListCreateDestroyViewSet):
+class SlugNameViewSet(ReplicaReadMixin, CachedListMixin,
+                      CoordinatedWriteMixin, SparseFieldsetMixin,
+                      ListCreateDestroyViewSet):
     lookup_field = 'slug'
     permission_classes = (
         IsAdminOrReadOnly,
         permissions.IsAuthenticatedOrReadOnly,
     )
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('$name',)
+    filter_backends = (NameSearchFilter,)
     pagination_class = PageNumberPagination
 
 
 class CategoryViewSet(SlugNameViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_namespaces = ('category',)
 
 
 class GenreViewSet(SlugNameViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_namespaces = ('genre',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+class TitleViewSet(ReplicaReadMixin, CachedResponseMixin,
+                   CoordinatedWriteMixin, SparseFieldsetMixin,
+                   ValuesListMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.all()
+    cache_namespaces = ('title', 'genre', 'category')
     permission_classes = (
         IsAdminOrReadOnly,
         permissions.IsAuthenticatedOrReadOnly,
     )
     filter_backends = (DjangoFilterBackend,)
     filter_class = TitleFilter
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-year', '-id')
+    # search results are ordered by relevance, not by cursor_ordering
+    page_number_params = ('search',)
+    sparse_select_related = {'category': 'category'}
+    sparse_prefetch_related = {'genre': 'genre'}
+    export_chunk_size = 500
+
+    def get_cache_namespaces(self):
+        if self.action == 'retrieve':
+            return (
+                f'title:{self.kwargs[self.lookup_field]}', 'genre', 'category'
+            )
+        return super().get_cache_namespaces()
 
     def get_serializer_class(self):
-        if self.action in ('create', 'partial_update'):
+        if self.action in (
+            'create', 'partial_update', 'bulk_partial_update'
+        ):
             return TitleSerializer
         return ReadOnlyTitleSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        # list of titles is created or updated in bulk
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
+    def bulk_partial_update(self, request, *args, **kwargs):
+        '''
+        Updates several titles at once, every item must contain title id.
+        '''
+        return run_write(lambda: self.update_titles(request))
+
+    def update_titles(self, request):
+        if not isinstance(request.data, list):
+            raise serializers.ValidationError(
+                {'non_field_errors': ['Ожидается список произведений.']}
+            )
+        ids = [
+            item.get('id') if isinstance(item, dict) else None
+            for item in request.data
+        ]
+        titles = Title.objects.in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+        errors = []
+        seen = set()
+        for pk in ids:
+            if not isinstance(pk, int) or pk not in titles:
+                errors.append({'id': ['Произведение не найдено.']})
+            elif pk in seen:
+                errors.append({'id': ['Произведение указано дважды.']})
+            else:
+                errors.append({})
+            seen.add(pk)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in ids], data=request.data, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+    def iter_export_rows(self, queryset):
+        """
+        Yields serialized titles as json lines. Titles are fetched by pk
+        ranges of export_chunk_size, genres and category are fetched once
+        per chunk, so memory usage doesn't depend on catalog size.
+        """
+        queryset = queryset.select_related('category').prefetch_related(
+            'genre'
+        ).order_by('pk')
+        last_pk = 0
+        while True:
+            chunk = list(
+                queryset.filter(pk__gt=last_pk)[:self.export_chunk_size]
+            )
+            if not chunk:
+                return
+            last_pk = chunk[-1].pk
+            serializer = self.get_serializer(chunk, many=True)
+            yield ''.join(
+                json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+                for row in serializer.data
+            )
+
+    @action(
+        methods=['get'],
+        detail=False,
+        permission_classes=[IsAuthenticated, IsAdminPermission],
+        pagination_class=None,
+    )
+    def export(self, request):
+        '''
+        Streams the whole catalog (filters are applied) as newline
+        delimited json.
+        '''
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.iter_export_rows(queryset),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(ReplicaReadMixin, CachedResponseMixin,
+                    CoordinatedWriteMixin, SparseFieldsetMixin,
+                    ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (AuthorPermission, IsAuthenticatedOrReadOnly)
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('pub_date', 'id')
+    sparse_required_columns = ('title',)
+    sparse_select_related = {'author': 'author'}
+
+    def get_cache_namespaces(self):
+        return (f'title:{self.kwargs.get("title_id")}:reviews', 'user')
+
+    def get_parents(self):
+        return ParentResolver(self.request, self.kwargs)
+
+    def get_title(self):
+        return self.get_parents().title()
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(title=title, author=self.request.user)
+        serializer.save(title=self.get_title(), author=self.request.user)
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        if self.detail:
+            # missing title gives 404 for the review as well
+            return Review.objects.filter(title_id=self.kwargs.get('title_id'))
+        return Review.objects.filter(title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, CachedResponseMixin,
+                     CoordinatedWriteMixin, SparseFieldsetMixin,
+                     ValuesListMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (AuthorPermission, IsAuthenticatedOrReadOnly)
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('pub_date', 'id')
+    sparse_required_columns = ('review',)
+    sparse_select_related = {'author': 'author'}
+
+    def get_cache_namespaces(self):
+        return (f'review:{self.kwargs.get("review_id")}:comments', 'user')
+
+    def get_parents(self):
+        return ParentResolver(self.request, self.kwargs)
+
+    def get_review(self):
+        return self.get_parents().review()
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id')
-        )
-        serializer.save(review=review, author=self.request.user)
+        serializer.save(review=self.get_review(), author=self.request.user)
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id')
-        )
-        return review.comments.all()
+        if self.detail:
+            # review and title are checked by the same query with a join
+            return Comment.objects.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+            )
+        return Comment.objects.filter(review=self.get_review())
@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DEFAULTS = {
+    # sqlite transactions of write actions take the write lock at BEGIN
+    'IMMEDIATE': True,
+    # attempts after the first one failed with "database is locked"
+    'RETRIES': 5,
+    # seconds, doubled on every retry and jittered
+    'BACKOFF': 0.05,
+    'MAX_BACKOFF': 1.0,
+    # write transactions of the process are run one at a time
+    'QUEUE': False,
+}
+
+LOCK_ERRORS = ('database is locked', 'database table is locked')
+
+
+def get_setting(name):
+    return getattr(settings, 'API_WRITES', {}).get(name, DEFAULTS[name])
+
+
+class DatabaseBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'База данных занята, повторите запрос позже.'
+    default_code = 'database_busy'
+
+
+class WriteQueue:
+    """
+    FIFO queue of writers: one write transaction of the process runs at
+    a time, the others wait for their turn in arrival order instead of
+    competing for the sqlite write lock.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.next_ticket = 0
+        self.serving = 0
+
+    @contextmanager
+    def turn(self):
+        with self.condition:
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            while ticket != self.serving:
+                self.condition.wait()
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.serving += 1
+                self.condition.notify_all()
+
+
+write_queue = WriteQueue()
+
+
+def is_lock_error(error):
+    return any(message in str(error) for message in LOCK_ERRORS)
+
+
+def backoff_delay(attempt):
+    """
+    Returns "full jitter" delay: random part of the exponential backoff,
+    so writers that failed together don't retry together.
+    """
+    cap = min(
+        get_setting('MAX_BACKOFF'), get_setting('BACKOFF') * 2 ** attempt
+    )
+    return random.uniform(0, cap)
+
+
+def begin_immediate(connection):
+    connection.cursor().execute('BEGIN IMMEDIATE')
+
+
+@contextmanager
+def write_transaction(using=None):
+    """
+    Atomic block that takes sqlite write lock at BEGIN (BEGIN IMMEDIATE),
+    so the transaction can't fail with "database is locked" after it has
+    already read data, and waits for the lock with the busy timeout.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if (
+        connection.in_atomic_block
+        or connection.vendor != 'sqlite'
+        or not get_setting('IMMEDIATE')
+    ):
+        with transaction.atomic(using=using):
+            yield
+        return
+    # Django starts outermost sqlite transactions with deferred BEGIN,
+    # nested blocks use savepoints and don't call it
+    connection._start_transaction_under_autocommit = partial(
+        begin_immediate, connection
+    )
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        del connection._start_transaction_under_autocommit
+
+
+def run_write(func, using=None):
+    """
+    Calls func in write_transaction. If the database is locked, the whole
+    transaction is retried up to RETRIES times with jittered backoff and
+    DatabaseBusy is raised after that. Inside an outer transaction func
+    is called once, since only the outer block can be retried.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            return func()
+    attempt = 0
+    while True:
+        try:
+            if get_setting('QUEUE'):
+                with write_queue.turn(), write_transaction(using):
+                    return func()
+            with write_transaction(using):
+                return func()
+        except OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            if attempt >= get_setting('RETRIES'):
+                raise DatabaseBusy() from error
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
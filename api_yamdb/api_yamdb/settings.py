@@ -74,6 +74,25 @@ DATABASES = {
     }
 }
 
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# read replicas of default, refreshed by refreshreplicas command, see
+# api/replicas.py
+API_REPLICAS = {
+    'ALIASES': [],
+    'STICKY_SECONDS': 5,
+}
+
+# applied to every sqlite connection, see api/sqlite.py
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
 
 # Password validation
 
@@ -119,12 +138,46 @@ DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
+API_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 5,
+}
+
+API_AUTH_CACHE = {
+    'TOKENS_MAXSIZE': 4096,
+    'USERS_MAXSIZE': 1024,
+    'USER_TIMEOUT': 60,
+}
+
+# in-process slug -> id cache of genres and categories, see api/slugs.py
+API_SLUG_CACHE = {
+    'MAXSIZE': 10000,
+    'TIMEOUT': 60 * 5,
+}
+
+# write actions of the API, see api/writes.py
+API_WRITES = {
+    'IMMEDIATE': True,
+    'RETRIES': 5,
+    'BACKOFF': 0.05,
+    'MAX_BACKOFF': 1.0,
+    'QUEUE': False,
+}
+
+# unique fields are checked by database constraints on write instead of
+# queries before it, see ConstraintWriteSerializerMixin
+API_CONSTRAINT_WRITES = True
+
+# access tokens carry role claims, see api/tokens.py
+API_ROLE_TOKENS = False
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'ALGORITHM': 'HS256',
@@ -31,7 +31,9 @@ class TitleAdmin(admin.ModelAdmin):
         'year',
         'description',
         'category',
+        'rating',
     )
+    readonly_fields = ('rating_sum', 'rating_count', 'rating')
     search_fields = (
         'name',
         'description',
@@ -1,12 +1,22 @@
 import csv
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
 
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.management.base import BaseCommand, CommandError
-from django.db import DatabaseError
+from django.db import DatabaseError, connection, transaction
 from django.db.models import ForeignKey
 
+from .scheduler import (DependencyCycleError, prefetch_map,
+                        run_in_dependency_order)
+from .streaming import (STDIN, Checkpoint, ChecksumStore, CsvSource,
+                        Progress, chunks, csv_records, file_checksum)
+
 
 class ImportDataException(Exception):
     """Exception in case of importing data to db."""
@@ -17,15 +27,29 @@ class ImportDataException(Exception):
 class ImportDataBaseCommand(BaseCommand):
     help = 'Import csv data into db via Django ORM'
     models = ()
+    # set by handle in parallel mode
+    parse_executor = None
+    parse_prefetch = 0
+    upsert = False
+    checksums = None
+    write_lock = nullcontext()
+    # file-like object to read data from when file is '-'
+    stealth_options = ('stdin',)
 
     _camel_2_snake_case = re.compile(r'(?<!^)(?=[A-Z])')
 
-    def _get_filename_by_model_name(self, model_name) -> str:
+    def _get_filename_by_model_name(self, model_name, data_dir=None) -> str:
         """
         Converts model name into a filename from which test data is imported.
+        If there is no csv file, but gzip-compressed one, the latter is used.
         """
         snake_case_name = self._camel_2_snake_case.sub('_', model_name).lower()
-        return os.path.join(settings.TEST_DATA_DIR, f'{snake_case_name}.csv')
+        filename = os.path.join(
+            data_dir or settings.TEST_DATA_DIR, f'{snake_case_name}.csv'
+        )
+        if not os.path.exists(filename) and os.path.exists(f'{filename}.gz'):
+            return f'{filename}.gz'
+        return filename
 
     def _get_foreign_key_model(self, model, fieldname):
         """
@@ -64,29 +88,284 @@ class ImportDataBaseCommand(BaseCommand):
                 record[key] = value
         return record
 
-    def _import_data(self, model, filename, verbosity) -> int:
+    def _build_bulk_record(self, model, row):
+        """
+        Same as _build_db_record but doesn't query related objects.
+        ForeignKey values are assigned to '<field>_id' attribute directly,
+        their existence is checked in batches by _check_foreign_keys.
+        """
+        record = {}
+        for key, value in row.items():
+            field = model._meta.get_field(key)
+            if isinstance(field, ForeignKey):
+                if value == '' and field.null:
+                    value = None
+                record[field.attname] = value
+            else:
+                record[key] = value
+        return record
+
+    def _check_foreign_keys(self, model, records, known_ids):
+        """
+        Checks that objects referenced by records exist, one query per
+        related model for the ids not seen before.
+        known_ids maps related model to set of ids that are known to exist.
+        """
+        for field in model._meta.concrete_fields:
+            if not isinstance(field, ForeignKey):
+                continue
+            related_model = field.remote_field.model
+            known = known_ids.setdefault(related_model, set())
+            ids = {
+                str(record[field.attname])
+                for record in records
+                if record.get(field.attname) is not None
+            } - known
+            if not ids:
+                continue
+            known.update(
+                str(pk) for pk in related_model.objects.filter(
+                    pk__in=ids
+                ).values_list('pk', flat=True)
+            )
+            missing = ids - known
+            if missing:
+                raise related_model.DoesNotExist(
+                    f'Не найдены записи модели {related_model.__name__} '
+                    f'с id {", ".join(sorted(missing))}'
+                )
+
+    def prepare_instance(self, instance):
+        """
+        Hook for filling fields that are normally set by pre_save signals,
+        since bulk_create doesn't send them.
+        """
+        pass
+
+    def _insert_batch(self, model, records, known_ids, batch_size) -> int:
+        """
+        Creates records which pks are not in db yet. In upsert mode also
+        updates existing records which field values differ.
+        Returns number of records created or updated.
+        """
+        unique_records = {}
+        for record in records:
+            unique_records.setdefault(str(record.get('id')), record)
+        existing_queryset = model.objects.filter(pk__in=unique_records.keys())
+        if self.upsert:
+            existing = {str(obj.pk): obj for obj in existing_queryset}
+        else:
+            existing = {
+                str(pk): None
+                for pk in existing_queryset.values_list('pk', flat=True)
+            }
+        new_records = [
+            record for pk, record in unique_records.items()
+            if pk not in existing
+        ]
+        self._check_foreign_keys(model, new_records, known_ids)
+        instances = []
+        for record in new_records:
+            instance = model(**record)
+            self.prepare_instance(instance)
+            instances.append(instance)
+        model.objects.bulk_create(instances, batch_size=batch_size)
+        updated_count = 0
+        if self.upsert:
+            updated_count = self._update_changed(
+                model, existing, unique_records, known_ids, batch_size
+            )
+        return len(instances) + updated_count
+
+    def _update_changed(self, model, existing, records, known_ids,
+                        batch_size) -> int:
+        """
+        Compares incoming records with existing objects and updates with
+        bulk_update only objects that have changed fields.
+        auto_now and auto_now_add fields are not compared, since on insert
+        their csv values are ignored as well.
+        """
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        changed_objects = []
+        changed_records = []
+        changed_fields = set()
+        for pk, obj in existing.items():
+            record = records[pk]
+            before = {
+                field.attname: getattr(obj, field.attname) for field in fields
+            }
+            for key, value in record.items():
+                field = model._meta.get_field(key)
+                if field.primary_key or getattr(field, 'auto_now', False) or (
+                    getattr(field, 'auto_now_add', False)
+                ):
+                    continue
+                setattr(obj, field.attname, field.to_python(value))
+            self.prepare_instance(obj)
+            obj_changed_fields = {
+                field.name for field in fields
+                if getattr(obj, field.attname) != before[field.attname]
+            }
+            if obj_changed_fields:
+                changed_fields |= obj_changed_fields
+                changed_objects.append(obj)
+                changed_records.append(record)
+        if not changed_objects:
+            return 0
+        self._check_foreign_keys(model, changed_records, known_ids)
+        model.objects.bulk_update(
+            changed_objects, sorted(changed_fields), batch_size=batch_size
+        )
+        return len(changed_objects)
+
+    def _skip_rows(self, records, rows_count, model_name, verbosity):
+        """
+        Skips rows that were imported before interruption.
+        """
+        for _ in islice(records, rows_count):
+            pass
+        if verbosity > 0:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{model_name}: пропущено {rows_count} строк, '
+                    'импортированных ранее'
+                )
+            )
+
+    def _import_rows(self, model, rows, verbosity) -> int:
+        records_imported_count = 0
+        for row in rows:
+            record = self._build_db_record(model, row)
+            if verbosity > 1:
+                msg = (
+                    f'Добавляется запись {record} в таблицу '
+                    f'модели {model.__name__}'
+                )
+                self.stdout.write(self.style.SUCCESS(msg))
+            try:
+                model.objects.get(pk=record.get('id'))
+            except model.DoesNotExist:
+                model.objects.create(**record)
+            records_imported_count += 1
+        return records_imported_count
+
+    def _prepare_chunk(self, model, header, lines, verbosity, bulk):
+        """
+        Parses raw csv records and builds db records from them without
+        touching db, so chunks can be prepared in worker threads while
+        another chunk is being written.
+        """
+        rows = list(csv.DictReader(lines, fieldnames=header))
+        if not bulk:
+            return rows
+        records = [self._build_bulk_record(model, row) for row in rows]
+        if verbosity > 1:
+            for record in records:
+                msg = (
+                    f'Добавляется запись {record} в таблицу '
+                    f'модели {model.__name__}'
+                )
+                self.stdout.write(self.style.SUCCESS(msg))
+        return records
+
+    def _write_chunk(self, model, prepared, verbosity, bulk, known_ids,
+                     batch_size) -> int:
+        if not bulk:
+            return self._import_rows(model, prepared, verbosity)
+        return self._insert_batch(model, prepared, known_ids, batch_size)
+
+    def _import_stream(self, model, source, stream, verbosity, bulk,
+                       batch_size, checkpoint) -> int:
+        model_name = model.__name__
+        rows_done = 0
+        if checkpoint:
+            rows_done = checkpoint.rows_done(model_name, source)
+        records_imported_count = 0
+        known_ids = {}
+        header = next(csv.reader(stream), None)
+        # fields are parsed from raw records chunk by chunk in
+        # _prepare_chunk, in worker threads in parallel mode
+        records = csv_records(stream)
+        if rows_done:
+            self._skip_rows(records, rows_done, model_name, verbosity)
+        progress = Progress(source)
+        rows_processed = 0
+
+        def prepare(lines):
+            return lines, self._prepare_chunk(
+                model, header, lines, verbosity, bulk
+            )
+
+        prepared_chunks = map(prepare, chunks(records, batch_size))
+        if self.parse_executor is not None:
+            prepared_chunks = prefetch_map(
+                self.parse_executor,
+                prepare,
+                chunks(records, batch_size),
+                self.parse_prefetch,
+            )
+        for rows, prepared in prepared_chunks:
+            with self.write_lock, (
+                transaction.atomic() if checkpoint else nullcontext()
+            ):
+                records_imported_count += self._write_chunk(
+                    model, prepared, verbosity, bulk, known_ids, batch_size
+                )
+            rows_done += len(rows)
+            rows_processed += len(rows)
+            if checkpoint:
+                checkpoint.save(model_name, source, rows_done)
+            if verbosity > 0:
+                self.stderr.write(
+                    progress.line(model_name, rows_done, rows_processed)
+                )
+        if checkpoint:
+            checkpoint.save(model_name, source, rows_done, done=True)
+        return records_imported_count
+
+    def _import_data(
+        self,
+        model,
+        filename,
+        verbosity,
+        bulk=False,
+        batch_size=1000,
+        checkpoint=None,
+        stdin=None,
+    ) -> int:
         """
         Parses csv data from filename and creates db records for models.
         Returns number of records imported.
+
+        filename may be a path to csv or gzip-compressed csv file or '-'
+        for stdin. Rows are streamed in chunks of batch_size. If checkpoint
+        is given, every chunk is committed in its own transaction and
+        number of committed rows is saved to the checkpoint, otherwise
+        the whole file is imported in one transaction.
+        In bulk mode existing pks and related objects are checked with
+        one query per chunk and records are inserted with bulk_create.
         """
+        source = CsvSource(filename, stdin)
+        # in parallel mode chunks of different models are written in turns,
+        # so a transaction can't be held for the whole file
+        single_transaction = not checkpoint and self.parse_executor is None
         try:
-            records_imported_count = 0
-            with open(filename, newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    record = self._build_db_record(model, row)
-                    if verbosity > 1:
-                        msg = (
-                            f'Добавляется запись {record} в таблицу '
-                            f'модели {model.__name__}'
-                        )
-                        self.stdout.write(self.style.SUCCESS(msg))
-                    try:
-                        model.objects.get(pk=record.get('id'))
-                    except model.DoesNotExist:
-                        model.objects.create(**record)
-                    records_imported_count += 1
-            return records_imported_count
+            with source as stream, (
+                transaction.atomic() if single_transaction else nullcontext()
+            ):
+                return self._import_stream(
+                    model, source, stream, verbosity, bulk, batch_size,
+                    checkpoint,
+                )
+        except ObjectDoesNotExist as err:
+            error_message = (
+                f'Ошибка при импорте данных модели {model.__name__} из '
+                f'{filename}: связанная запись не найдена. Причина: {err}'
+            )
+            raise ImportDataException(error_message) from err
         except FileNotFoundError:
             error_message = (
                 f'Файл {filename} с тестовыми данными не был найден '
@@ -120,6 +399,110 @@ class ImportDataBaseCommand(BaseCommand):
             )
         self.stdout.write(self.style.SUCCESS(BORDER))
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Импортировать данные через bulk_create пачками',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пачки строк, обрабатываемых и фиксируемых за раз',
+        )
+        parser.add_argument(
+            '--data-dir',
+            help='Папка с csv файлами вместо TEST_DATA_DIR',
+        )
+        parser.add_argument(
+            '--file',
+            action='append',
+            default=[],
+            metavar='MODEL=PATH',
+            help=(
+                'Путь к csv (или csv.gz) файлу для модели, '
+                '"-" для чтения из stdin. Можно указать несколько раз'
+            ),
+        )
+        parser.add_argument(
+            '--models',
+            help='Импортировать только перечисленные через запятую модели',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(
+                settings.BASE_DIR, 'importdata.checkpoint.json'
+            ),
+            help='Файл, в который сохраняется прогресс импорта',
+        )
+        parser.add_argument(
+            '--no-checkpoint',
+            action='store_true',
+            help=(
+                'Не сохранять прогресс, импортировать каждый файл '
+                'в одной транзакции'
+            ),
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Обновлять существующие записи, значения полей которых '
+                'изменились, и пропускать файлы, не изменившиеся '
+                'с прошлого импорта'
+            ),
+        )
+        parser.add_argument(
+            '--checksums',
+            default=os.path.join(
+                settings.BASE_DIR, 'importdata.checksums.json'
+            ),
+            help='Файл с контрольными суммами импортированных файлов',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help=(
+                'Число потоков: независимые модели импортируются '
+                'параллельно в порядке зависимостей по ForeignKey'
+            ),
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить прерванный импорт с последней сохраненной пачки',
+        )
+
+    def finish_import(self, imported_models, options):
+        """
+        Hook called after all models were imported.
+        """
+        pass
+
+    def _get_models(self, options):
+        if not options.get('models'):
+            return self.models
+        names = {name.strip() for name in options['models'].split(',')}
+        unknown = names - {model.__name__ for model in self.models}
+        if unknown:
+            raise CommandError(
+                f'Неизвестные модели: {", ".join(sorted(unknown))}'
+            )
+        return tuple(model for model in self.models if model.__name__ in names)
+
+    def _get_files(self, options):
+        files = {}
+        for value in options.get('file') or ():
+            model_name, sep, path = value.partition('=')
+            if not sep or not path:
+                raise CommandError(
+                    f'Неверный формат --file {value}, ожидается MODEL=PATH'
+                )
+            files[model_name] = path
+        return files
+
     def handle(self, *args, **options):
         """
         The method that exucutes main logic of importdata command.
@@ -129,6 +512,7 @@ class ImportDataBaseCommand(BaseCommand):
         and uses it to get or create record in the model table.
 
         Note: it doesn't fail in case records are already in db.
+        With --resume it continues from the last chunk saved in checkpoint.
         """
 
         if not self.models:
@@ -140,21 +524,122 @@ class ImportDataBaseCommand(BaseCommand):
             )
             return
 
-        summary_data = {model.__name__: 0 for model in self.models}
-
-        for model in self.models:
+        models = self._get_models(options)
+        files = self._get_files(options)
+        self.upsert = options.get('upsert', False)
+        if self.upsert:
+            # upsert compares records in batches, which bulk mode does
+            options['bulk'] = True
+            self.checksums = ChecksumStore(options['checksums'])
+        checkpoint = None
+        if not options.get('no_checkpoint'):
+            checkpoint = Checkpoint(
+                options['checkpoint'], resume=options.get('resume', False)
+            )
 
-            filename = self._get_filename_by_model_name(model.__name__)
+        summary_data = {model.__name__: 0 for model in models}
+        imported_models = []
+        jobs = options.get('jobs') or 1
 
-            try:
-                verbosity = options.get('verbosity', 1)
-                records_imported_count = self._import_data(
-                    model, filename, verbosity
+        try:
+            if jobs > 1:
+                self._import_parallel(
+                    models, files, checkpoint, options, summary_data,
+                    imported_models,
                 )
-                summary_data[model.__name__] = records_imported_count
-            except ImportDataException as err:
-                # show at least what were added so far
-                self.display_summary(summary_data)
-                raise CommandError(err) from err
+            else:
+                for model in models:
+                    count = self._import_model(
+                        model, files, checkpoint, options
+                    )
+                    if count is not None:
+                        summary_data[model.__name__] = count
+                        imported_models.append(model)
+        except (ImportDataException, DependencyCycleError) as err:
+            # show at least what were added so far
+            self.finish_import(imported_models, options)
+            self.display_summary(summary_data)
+            raise CommandError(err) from err
 
+        if checkpoint:
+            checkpoint.clear()
+        self.finish_import(imported_models, options)
         self.display_summary(summary_data)
+
+    def _import_model(self, model, files, checkpoint, options):
+        """
+        Imports data of one model. Returns number of imported records or
+        None if model import was already completed according to checkpoint.
+        """
+        verbosity = options.get('verbosity', 1)
+        filename = files.get(model.__name__) or (
+            self._get_filename_by_model_name(
+                model.__name__, options.get('data_dir')
+            )
+        )
+        if checkpoint and checkpoint.is_done(model.__name__, filename):
+            if verbosity > 0:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'{model.__name__}: импорт из {filename} '
+                        'уже был завершен'
+                    )
+                )
+            return None
+        checksum = None
+        if self.checksums is not None and filename != STDIN:
+            try:
+                checksum = file_checksum(filename)
+            except FileNotFoundError:
+                # reported with the rest of import errors
+                pass
+            if checksum and self.checksums.is_unchanged(
+                model.__name__, filename, checksum
+            ):
+                if verbosity > 0:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'{model.__name__}: файл {filename} не изменился '
+                            'с прошлого импорта'
+                        )
+                    )
+                return None
+        count = self._import_data(
+            model,
+            filename,
+            verbosity,
+            bulk=options.get('bulk', False),
+            batch_size=options.get('batch_size', 1000),
+            checkpoint=checkpoint,
+            stdin=options.get('stdin'),
+        )
+        if checksum:
+            self.checksums.save(model.__name__, filename, checksum)
+        return count
+
+    def _import_parallel(self, models, files, checkpoint, options,
+                         summary_data, imported_models):
+        """
+        Imports models that don't depend on each other concurrently.
+        Chunks are prepared in a thread pool, while writes go through a
+        lock since SQLite allows only one writer at a time.
+        """
+        jobs = options['jobs']
+        if connection.vendor == 'sqlite':
+            self.write_lock = threading.Lock()
+
+        def import_model(model):
+            count = self._import_model(model, files, checkpoint, options)
+            if count is not None:
+                summary_data[model.__name__] = count
+                imported_models.append(model)
+            return count
+
+        with ThreadPoolExecutor(max_workers=jobs) as parse_executor:
+            self.parse_executor = parse_executor
+            self.parse_prefetch = jobs * 2
+            try:
+                run_in_dependency_order(models, import_model, jobs)
+            finally:
+                self.parse_executor = None
+                self.write_lock = nullcontext()
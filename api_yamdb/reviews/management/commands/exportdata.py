@@ -0,0 +1,19 @@
+from reviews.management.export import ExportDataBaseCommand
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+
+class Command(ExportDataBaseCommand):
+    models = (
+        (Category, ('id', 'name', 'slug')),
+        (Genre, ('id', 'name', 'slug')),
+        (Title, ('id', 'name', 'year', 'category', 'description')),
+        (GenreTitle, ('id', 'title_id', 'genre_id')),
+        (
+            User,
+            ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+        ),
+        (Review, ('id', 'title_id', 'text', 'author', 'score', 'pub_date')),
+        (Comment, ('id', 'review_id', 'text', 'author', 'pub_date')),
+    )
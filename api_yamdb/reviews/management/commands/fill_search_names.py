@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_versions
+from reviews.models import Category, Genre
+from reviews.search import fill_search_names
+
+
+class Command(BaseCommand):
+    help = 'Fill normalized search names of categories and genres'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество записей, обрабатываемых за один раз',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        processed = {
+            model._meta.verbose_name_plural: 0 for model in (Category, Genre)
+        }
+        for model, chunk_count in fill_search_names(
+            options['chunk_size'], options['database']
+        ):
+            name = model._meta.verbose_name_plural
+            processed[name] += chunk_count
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'{name}: обработано записей: {processed[name]}'
+                )
+        # bulk_update doesn't send signals that invalidate cached responses
+        bump_versions('category', 'genre')
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Имена для поиска обновлены: ' + ', '.join(
+                    f'{name} — {count}' for name, count in processed.items()
+                )
+            )
+        )
@@ -1,5 +1,8 @@
+from api.cache import GLOBAL_NAMESPACE, bump_versions
 from reviews.management.base import ImportDataBaseCommand
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.ratings import recalculate_ratings
+from reviews.search import normalize_name
 from users.models import User
 
 
@@ -13,3 +16,19 @@ class Command(ImportDataBaseCommand):
         Review,
         Comment,
     )
+
+    def prepare_instance(self, instance):
+        if isinstance(instance, (Category, Genre)):
+            instance.search_name = normalize_name(instance.name)
+
+    def finish_import(self, imported_models, options):
+        """
+        bulk_create doesn't send signals, so stored ratings are recalculated
+        and cached responses are invalidated once data is imported.
+        """
+        if not options.get('bulk') or not imported_models:
+            return
+        if Review in imported_models:
+            for _ in recalculate_ratings(options.get('batch_size', 1000)):
+                pass
+        bump_versions(GLOBAL_NAMESPACE)
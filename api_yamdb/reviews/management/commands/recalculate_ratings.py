@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored title ratings from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество произведений, обрабатываемых за один раз',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        processed = 0
+        for chunk_count in recalculate_ratings(
+            options['chunk_size'], options['database']
+        ):
+            processed += chunk_count
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Обработано произведений: {processed}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Рейтинг пересчитан для {processed} произведений'
+            )
+        )
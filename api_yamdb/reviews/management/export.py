@@ -0,0 +1,149 @@
+import csv
+import datetime
+import gzip
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+
+class ExportDataBaseCommand(BaseCommand):
+    help = 'Export db data into csv files in the importdata format'
+    # pairs of model and csv columns, columns are field names or attnames
+    models = ()
+
+    _camel_2_snake_case = re.compile(r'(?<!^)(?=[A-Z])')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default='.',
+            help='Папка, в которую сохраняются csv файлы',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Количество записей, читаемых из БД за раз',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Число потоков, в которых параллельно выгружаются модели',
+        )
+        parser.add_argument(
+            '--models',
+            help='Выгрузить только перечисленные через запятую модели',
+        )
+
+    def _get_filename_by_model_name(self, model_name, output_dir, compress):
+        snake_case_name = self._camel_2_snake_case.sub('_', model_name).lower()
+        extension = 'csv.gz' if compress else 'csv'
+        return os.path.join(output_dir, f'{snake_case_name}.{extension}')
+
+    @staticmethod
+    def _format_value(value):
+        if value is None:
+            return ''
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        return value
+
+    def _open(self, filename, compress):
+        if compress:
+            return gzip.open(filename, 'wt', encoding='utf-8', newline='')
+        return open(filename, 'w', encoding='utf-8', newline='')
+
+    def _export_model(self, model, columns, filename, compress, chunk_size):
+        """
+        Streams model table into csv file. Rows are fetched with iterator,
+        so memory usage doesn't depend on table size. Data is written into
+        temporary file that replaces target file once export is done.
+        """
+        attnames = [
+            model._meta.get_field(column).attname for column in columns
+        ]
+        rows = (
+            model.objects.order_by('pk')
+            .values_list(*attnames)
+            .iterator(chunk_size=chunk_size)
+        )
+        tmp_filename = f'{filename}.tmp'
+        records_exported_count = 0
+        try:
+            with self._open(tmp_filename, compress) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(
+                        [self._format_value(value) for value in row]
+                    )
+                    records_exported_count += 1
+            os.replace(tmp_filename, filename)
+        except (OSError, DatabaseError) as err:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            raise CommandError(
+                f'Ошибка при выгрузке модели {model.__name__} в {filename}. '
+                f'Причина: {err}'
+            ) from err
+        return records_exported_count
+
+    def _get_models(self, options):
+        if not options.get('models'):
+            return self.models
+        names = {name.strip() for name in options['models'].split(',')}
+        unknown = names - {model.__name__ for model, _ in self.models}
+        if unknown:
+            raise CommandError(
+                f'Неизвестные модели: {", ".join(sorted(unknown))}'
+            )
+        return tuple(
+            (model, columns) for model, columns in self.models
+            if model.__name__ in names
+        )
+
+    def display_summary(self, summary_data):
+        BORDER = '=' * 60
+        self.stdout.write(self.style.SUCCESS(BORDER))
+        self.stdout.write(self.style.SUCCESS('ЗАПИСЕЙ ВЫГРУЖЕНО\n'))
+        for model_name, recs_count in summary_data.items():
+            self.stdout.write(
+                self.style.SUCCESS(f'{model_name:<15}: {recs_count:>3}')
+            )
+        self.stdout.write(self.style.SUCCESS(BORDER))
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        models = self._get_models(options)
+
+        def export(model_columns):
+            model, columns = model_columns
+            filename = self._get_filename_by_model_name(
+                model.__name__, output_dir, options['gzip']
+            )
+            try:
+                return model.__name__, self._export_model(
+                    model, columns, filename, options['gzip'],
+                    options['chunk_size'],
+                )
+            finally:
+                if options['jobs'] > 1:
+                    # worker thread connections are not reused
+                    connections.close_all()
+
+        if options['jobs'] > 1:
+            with ThreadPoolExecutor(max_workers=options['jobs']) as executor:
+                summary_data = dict(executor.map(export, models))
+        else:
+            summary_data = dict(map(export, models))
+        self.display_summary(summary_data)
@@ -0,0 +1,98 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import connections
+from django.db.models import ForeignKey
+
+
+class DependencyCycleError(Exception):
+    """Models can't be ordered because their foreign keys form a cycle."""
+
+    pass
+
+
+def model_dependencies(models):
+    """
+    Returns dict where every model is mapped to the set of models from the
+    same list it references by ForeignKey, so they must be imported first.
+    """
+    dependencies = {}
+    for model in models:
+        dependencies[model] = {
+            field.remote_field.model
+            for field in model._meta.concrete_fields
+            if isinstance(field, ForeignKey)
+            and field.remote_field.model in models
+            and field.remote_field.model is not model
+        }
+    return dependencies
+
+
+def _run_closing_connections(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # every thread has its own db connections, they are not reused
+        connections.close_all()
+
+
+def run_in_dependency_order(models, func, jobs):
+    """
+    Calls func(model) for every model in up to `jobs` threads. A model is
+    started as soon as all models it depends on are done, so independent
+    models (e.g. Category, Genre and User) are imported concurrently.
+
+    Returns dict of results by model. If any call fails, models that were
+    not started yet are not started, running ones are waited for and the
+    first error is raised.
+    """
+    dependencies = model_dependencies(models)
+    pending = list(models)
+    done = set()
+    results = {}
+    running = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            if error is None:
+                for model in [
+                    model for model in pending
+                    if dependencies[model] <= done
+                ]:
+                    pending.remove(model)
+                    future = executor.submit(
+                        _run_closing_connections, func, model
+                    )
+                    running[future] = model
+            if not running:
+                if error is None:
+                    raise DependencyCycleError(
+                        'Не удалось определить порядок импорта моделей: '
+                        + ', '.join(model.__name__ for model in pending)
+                    )
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                model = running.pop(future)
+                try:
+                    results[model] = future.result()
+                    done.add(model)
+                except Exception as err:
+                    error = error or err
+    if error is not None:
+        raise error
+    return results
+
+
+def prefetch_map(executor, func, iterable, prefetch):
+    """
+    Like executor.map, but keeps at most `prefetch` items in flight
+    instead of consuming the whole iterable at once.
+    """
+    futures = deque()
+    for item in iterable:
+        futures.append(executor.submit(func, item))
+        if len(futures) >= prefetch:
+            yield futures.popleft().result()
+    while futures:
+        yield futures.popleft().result()
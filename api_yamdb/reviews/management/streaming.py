@@ -0,0 +1,201 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from itertools import islice
+
+GZIP_MAGIC = b'\x1f\x8b'
+STDIN = '-'
+
+
+class CsvSource:
+    """
+    Opens csv data from a file path or stdin ('-') as a text stream.
+    Gzip-compressed data is detected by its magic bytes, so both
+    `title.csv` and `title.csv.gz` can be passed.
+
+    `bytes_read` and `total_bytes` are used to estimate import progress,
+    total is unknown for stdin.
+    """
+
+    def __init__(self, path, stdin=None):
+        self.path = path
+        self.stdin = stdin or sys.stdin
+        self.raw = None
+        self.total_bytes = None
+
+    def __str__(self):
+        return self.path
+
+    def __enter__(self):
+        if self.path == STDIN:
+            self.raw = getattr(self.stdin, 'buffer', self.stdin)
+        else:
+            self.raw = open(self.path, 'rb')
+            self.total_bytes = os.path.getsize(self.path)
+        if not isinstance(self.raw, io.BufferedReader):
+            self.raw = io.BufferedReader(self.raw)
+        binary = self.raw
+        if self.raw.peek(2)[:2] == GZIP_MAGIC:
+            binary = gzip.GzipFile(fileobj=self.raw, mode='rb')
+        self.text = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        return self.text
+
+    def __exit__(self, *exc_info):
+        if self.path != STDIN:
+            self.text.close()
+        else:
+            self.text.detach()
+
+    @property
+    def bytes_read(self):
+        try:
+            return self.raw.tell()
+        except (OSError, ValueError):
+            return None
+
+
+def csv_records(stream):
+    """
+    Splits csv text stream into raw records without parsing fields, so
+    chunks of records can be parsed in worker threads. A line ends the
+    record when the number of quotes read so far is even, i.e. the line
+    break is not inside a quoted field. Empty lines are skipped like
+    csv.reader does.
+    """
+    record = []
+    quotes = 0
+    for line in stream:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        if record != [line] or line.strip('\r\n'):
+            yield ''.join(record)
+        record = []
+        quotes = 0
+    if record:
+        yield ''.join(record)
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Progress:
+    """
+    Calculates import speed in rows per second and estimated time left
+    based on part of the source that was read.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.started = time.monotonic()
+        self.start_bytes = source.bytes_read or 0
+
+    def line(self, model_name, rows_done, rows_processed):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = rows_processed / elapsed
+        line = f'{model_name}: {rows_done} строк, {rate:.0f} строк/с'
+        read = self.source.bytes_read
+        total = self.source.total_bytes
+        if total and read and read > self.start_bytes:
+            speed = (read - self.start_bytes) / elapsed
+            eta = max(total - read, 0) / speed
+            line += (
+                f', {min(read / total, 1):.0%}, '
+                f'осталось ~{time.strftime("%H:%M:%S", time.gmtime(eta))}'
+            )
+        return line
+
+
+class Checkpoint:
+    """
+    Stores number of csv rows committed for every model, so interrupted
+    import can be resumed from the last committed chunk.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.state = {}
+        self.lock = threading.Lock()
+        if resume and os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                self.state = json.load(checkpoint_file)
+
+    def rows_done(self, model_name, source):
+        state = self.state.get(model_name)
+        if not state or state.get('source') != str(source):
+            return 0
+        return state['rows']
+
+    def is_done(self, model_name, source):
+        state = self.state.get(model_name)
+        return bool(
+            state and state.get('source') == str(source) and state['done']
+        )
+
+    def save(self, model_name, source, rows, done=False):
+        with self.lock:
+            self.state[model_name] = {
+                'source': str(source),
+                'rows': rows,
+                'done': done,
+            }
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as checkpoint_file:
+                json.dump(self.state, checkpoint_file)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def file_checksum(path, block_size=1024 * 1024):
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as data_file:
+        for block in iter(lambda: data_file.read(block_size), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+class ChecksumStore:
+    """
+    Remembers checksums of files imported for every model, so unchanged
+    files can be skipped on the next run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as checksum_file:
+                self.state = json.load(checksum_file)
+
+    def is_unchanged(self, model_name, source, checksum):
+        return self.state.get(model_name) == {
+            'source': str(source),
+            'checksum': checksum,
+        }
+
+    def save(self, model_name, source, checksum):
+        with self.lock:
+            self.state[model_name] = {
+                'source': str(source),
+                'checksum': checksum,
+            }
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as checksum_file:
+                json.dump(self.state, checksum_file)
+            os.replace(tmp_path, self.path)
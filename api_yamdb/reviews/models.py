@@ -1,5 +1,5 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from .validators import validate_not_future_year
 from users.models import User
@@ -8,6 +8,13 @@ from users.models import User
 class Category(models.Model):
     name = models.CharField('имя категории', max_length=256)
     slug = models.SlugField(max_length=50, unique=True)
+    search_name = models.CharField(
+        'имя для поиска',
+        max_length=256,
+        db_index=True,
+        editable=False,
+        default='',
+    )
 
     class Meta:
         ordering = ('slug',)
@@ -21,6 +28,13 @@ class Category(models.Model):
 class Genre(models.Model):
     name = models.CharField('имя жанра', max_length=256)
     slug = models.SlugField(max_length=50, unique=True)
+    search_name = models.CharField(
+        'имя для поиска',
+        max_length=256,
+        db_index=True,
+        editable=False,
+        default='',
+    )
 
     class Meta:
         ordering = ('slug',)
@@ -45,11 +59,19 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField('сумма оценок', default=0)
+    rating_count = models.PositiveIntegerField('число оценок', default=0)
+    rating = models.PositiveSmallIntegerField(
+        'рейтинг', null=True, blank=True, default=None
+    )
 
     class Meta:
         ordering = ('-year',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('-year', '-id'), name='title_year_id_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=('name', 'year', 'category'),
@@ -82,12 +104,30 @@ class Review(models.Model):
         Title, on_delete=models.CASCADE, related_name='reviews'
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # title rating is updated by post_save receiver, so keep both
+        # writes in one transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = [
             'pub_date',
         ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'], name='unique_review'
@@ -114,6 +154,12 @@ class Comment(models.Model):
         ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.review} {self.text[:15]}'
@@ -0,0 +1,74 @@
+from django.db.models import (Case, Count, ExpressionWrapper, F,
+                              IntegerField, Sum, Value, When)
+
+from .models import Review, Title
+
+
+def update_title_rating(title_id, score_delta, count_delta, using='default'):
+    """
+    Applies score and reviews count changes to the stored title rating.
+
+    Everything is done in a single UPDATE with F() expressions, so
+    concurrent review writes don't overwrite each other. The right hand
+    side of every assignment sees old column values, thus new rating is
+    calculated from old sum/count plus deltas.
+    """
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    Title.objects.using(using).filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(
+                rating_count__gt=-count_delta,
+                then=ExpressionWrapper(
+                    new_sum / new_count, output_field=IntegerField()
+                ),
+            ),
+            default=Value(None),
+            output_field=IntegerField(),
+        ),
+    )
+
+
+def recalculate_ratings(chunk_size=1000, using='default'):
+    """
+    Recomputes stored ratings from reviews table chunk by chunk.
+
+    Yields number of titles processed after each chunk.
+    """
+    last_pk = 0
+    titles = Title.objects.using(using).order_by('pk')
+    while True:
+        chunk = list(
+            titles.filter(pk__gt=last_pk).only(
+                'pk', 'rating_sum', 'rating_count', 'rating'
+            )[:chunk_size]
+        )
+        if not chunk:
+            return
+        last_pk = chunk[-1].pk
+        totals = {
+            row['title']: (row['score_sum'], row['score_count'])
+            for row in Review.objects.using(using)
+            .filter(title__in=[title.pk for title in chunk])
+            .order_by()
+            .values('title')
+            .annotate(score_sum=Sum('score'), score_count=Count('pk'))
+        }
+        changed = []
+        for title in chunk:
+            score_sum, score_count = totals.get(title.pk, (0, 0))
+            rating = score_sum // score_count if score_count else None
+            if (title.rating_sum, title.rating_count, title.rating) != (
+                score_sum, score_count, rating
+            ):
+                title.rating_sum = score_sum
+                title.rating_count = score_count
+                title.rating = rating
+                changed.append(title)
+        if changed:
+            Title.objects.using(using).bulk_update(
+                changed, ('rating_sum', 'rating_count', 'rating')
+            )
+        yield len(chunk)
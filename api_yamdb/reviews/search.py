@@ -0,0 +1,212 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+from .models import Category, Genre, Title
+
+_word = re.compile(r'\w+')
+_spaces = re.compile(r'\s+')
+
+# greatest code point, every string with the prefix sorts before prefix + it
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def normalize_name(value):
+    """
+    Case-folds name and collapses whitespace, so names can be searched
+    with plain comparison of indexed column values.
+    """
+    return _spaces.sub(' ', value).strip().casefold()
+
+
+def prefix_range(field_name, prefix):
+    """
+    Returns lookups that select values starting with prefix using range
+    comparison, that unlike LIKE is always served by a B-tree index.
+    """
+    return {
+        f'{field_name}__gte': prefix,
+        f'{field_name}__lt': prefix + PREFIX_UPPER_BOUND,
+    }
+
+
+def fill_search_names(chunk_size=1000, using='default'):
+    """
+    Recomputes `search_name` of categories and genres chunk by chunk, for
+    rows written before the column existed or in bypass of the ORM.
+
+    Yields model and number of its rows processed after each chunk.
+    """
+    for model in (Category, Genre):
+        last_pk = 0
+        objects = model.objects.using(using).order_by('pk')
+        while True:
+            chunk = list(
+                objects.filter(pk__gt=last_pk).only(
+                    'pk', 'name', 'search_name'
+                )[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            changed = []
+            for obj in chunk:
+                search_name = normalize_name(obj.name)
+                if obj.search_name != search_name:
+                    obj.search_name = search_name
+                    changed.append(obj)
+            if changed:
+                model.objects.using(using).bulk_update(
+                    changed, ('search_name',)
+                )
+            yield model, len(chunk)
+
+
+# fields indexed by FTS5, search_titles ranks titles by relevance and
+# search_names matches categories and genres by word prefixes
+FTS_FIELDS = {
+    Title: ('name', 'description'),
+    Category: ('name',),
+    Genre: ('name',),
+}
+
+# whether FTS index exists, by database alias and table; reset for every
+# new connection by reviews.signals
+fts_tables = {}
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def fts_available(using='default', model=Title):
+    """
+    Checks that FTS index exists once per connection instead of querying
+    sqlite_master on every search.
+    """
+    key = (using, fts_table(model))
+    if key not in fts_tables:
+        fts_tables[key] = check_fts_table(using, fts_table(model))
+    return fts_tables[key]
+
+
+def forget_fts_tables(using):
+    for key in [key for key in fts_tables if key[0] == using]:
+        del fts_tables[key]
+
+
+def check_fts_table(using, table):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def create_fts(model, using='default'):
+    """
+    Creates FTS5 index over FTS_FIELDS of the model and triggers that keep
+    it in sync with the model table on every write, including bulk ones.
+
+    unicode61 tokenizer folds case for all letters, not only ASCII, so
+    search for 'побег' finds 'Побег из Шоушенка'.
+    """
+    connection = connections[using]
+    fts = fts_table(model)
+    if connection.vendor != 'sqlite' or check_fts_table(using, fts):
+        return False
+    table = model._meta.db_table
+    fields = FTS_FIELDS[model]
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+    statements = (
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{columns}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) "
+        f"VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts}_au "
+        f"AFTER UPDATE OF {columns} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) "
+        f"VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    )
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+    fts_tables[(using, fts)] = True
+    return True
+
+
+def create_search_indexes(using='default'):
+    for model in FTS_FIELDS:
+        create_fts(model, using)
+
+
+def build_match_query(text):
+    """
+    Converts user input into FTS5 query: every word is quoted, so no FTS
+    syntax can be injected, and matched as a prefix.
+    """
+    return ' '.join(f'"{word}"*' for word in _word.findall(text))
+
+
+def search_titles(queryset, text):
+    """
+    Filters titles by words in name or description and orders them by
+    relevance (bm25). Falls back to icontains on databases without FTS.
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not fts_available(queryset.db):
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    table = Title._meta.db_table
+    fts = fts_table(Title)
+    # titles are joined with FTS index, so MATCH is evaluated once and
+    # bm25() of the matched row is used for ranking
+    return queryset.extra(
+        tables=[fts],
+        where=[f'{fts} MATCH %s', f'{fts}.rowid = {table}.id'],
+        params=[match],
+        select={'search_rank': f'bm25({fts})'},
+    ).order_by('search_rank', *Title._meta.ordering, '-id')
+
+
+def search_names(queryset, text):
+    """
+    Filters categories or genres by the beginning of words of the name:
+    every word of the text must be a prefix of some word of the name.
+    Prefix queries walk the sorted term index of FTS5 table, so no row of
+    the model table is scanned. Databases without FTS fall back to prefix
+    of the whole normalized name served by `search_name` index.
+    """
+    model = queryset.model
+    if not fts_available(queryset.db, model):
+        return queryset.filter(
+            **prefix_range('search_name', normalize_name(text))
+        )
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    table = model._meta.db_table
+    fts = fts_table(model)
+    return queryset.extra(
+        tables=[fts],
+        where=[f'{fts} MATCH %s', f'{fts}.rowid = {table}.id'],
+        params=[match],
+    )
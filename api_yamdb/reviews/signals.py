@@ -0,0 +1,61 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .models import Category, Genre, Review
+from .ratings import update_title_rating
+from .search import (create_search_indexes, forget_fts_tables,
+                     normalize_name)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, using, **kwargs):
+    """
+    Keeps title rating in sync when review is created or its score changed.
+    """
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1, using)
+    else:
+        old_score = getattr(instance, '_loaded_score', None)
+        if old_score is not None and old_score != instance.score:
+            update_title_rating(
+                instance.title_id, instance.score - old_score, 0, using
+            )
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, using, **kwargs):
+    """
+    Removes review score from title rating. Also called for reviews
+    deleted by cascade, e.g. when their author is deleted.
+    """
+    update_title_rating(instance.title_id, -instance.score, -1, using)
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    """
+    Creates full-text search indexes once reviews tables exist.
+    """
+    if sender.name == 'reviews':
+        create_search_indexes(using)
+
+
+@receiver(connection_created)
+def forget_search_index(sender, connection, **kwargs):
+    """
+    New connection may point to another database, e.g. the test one, so
+    presence of full-text search index is checked again.
+    """
+    forget_fts_tables(connection.alias)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Genre)
+def fill_search_name(sender, instance, **kwargs):
+    """
+    Stores normalized name used by name search on databases without FTS.
+    """
+    instance.search_name = normalize_name(instance.name)
@@ -0,0 +1,29 @@
+from django.contrib import admin
+
+from .models import OutgoingEmail
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'to',
+        'subject',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at',
+    )
+    list_filter = (
+        'status',
+    )
+    search_fields = (
+        'to',
+    )
+    readonly_fields = (
+        'claim',
+        'last_error',
+        'created_at',
+        'sent_at',
+    )
+
+
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -0,0 +1,84 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from users.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди исходящих писем пачками через одно '
+        'соединение с почтовым сервером'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем, отправляемых за один раз',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Количество попыток, после которых письмо не отправляется',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=int,
+            default=60,
+            help='Задержка перед первой повторной попыткой в секундах, '
+                 'удваивается с каждой попыткой',
+        )
+        parser.add_argument(
+            '--lease',
+            type=int,
+            default=300,
+            help='Через сколько секунд письма упавшего обработчика снова '
+                 'попадают в очередь',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, когда очередь пуста, а ждать новых писем',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками пустой очереди в секундах',
+        )
+
+    def handle(self, *args, **options):
+        totals = [0, 0, 0]
+        connection = get_connection()
+        with connection:
+            while True:
+                result = send_batch(
+                    connection,
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                    backoff=options['backoff'],
+                    lease=options['lease'],
+                )
+                if result is None:
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+                totals = [
+                    total + count for total, count in zip(totals, result)
+                ]
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        'Отправлено: {}, отложено: {}, не отправлено: {}'
+                        .format(*result)
+                    )
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Отправлено писем: {}, отложено: {}, не отправлено: {}'
+                .format(*totals)
+            )
+        )
@@ -2,6 +2,7 @@ from enum import Enum
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class ROLES(Enum):
@@ -17,6 +18,19 @@ class ROLES(Enum):
         return self.name
 
 
+class EMAIL_STATUSES(Enum):
+    pending = 'Ожидает отправки'
+    sent = 'Отправлено'
+    dead = 'Не отправлено'
+
+    @classmethod
+    def get_statuses(cls):
+        return [(status.name, status.value) for status in cls]
+
+    def __str__(self):
+        return self.name
+
+
 class User(AbstractUser):
     username = models.CharField(max_length=150,
                                 unique=True,
@@ -40,9 +54,68 @@ class User(AbstractUser):
                             verbose_name='Роль')
     confirmation_code = models.CharField(max_length=50,
                                          default='')
+    role_version = models.PositiveIntegerField(default=0,
+                                               editable=False,
+                                               verbose_name='Версия прав')
 
     USERNAME_FIELD = 'username'
+    # role tokens issued before any of these fields changed are revoked
+    ROLE_FIELDS = ('role', 'is_superuser', 'is_active')
 
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_role = instance.get_role_state()
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
+    def get_role_state(self):
+        return tuple(self.__dict__.get(field) for field in self.ROLE_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded_role = getattr(self, '_loaded_role', None)
+        if loaded_role is not None and loaded_role != self.get_role_state():
+            self.role_version += 1
+        super().save(*args, **kwargs)
+        self._loaded_role = self.get_role_state()
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(max_length=254,
+                                   verbose_name='Отправитель')
+    to = models.EmailField(max_length=254, verbose_name='Получатель')
+    status = models.CharField(max_length=20,
+                              choices=EMAIL_STATUSES.get_statuses(),
+                              default=EMAIL_STATUSES.pending.name,
+                              verbose_name='Статус')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попытки')
+    next_attempt_at = models.DateTimeField(default=timezone.now,
+                                           verbose_name='Следующая попытка')
+    claim = models.CharField(max_length=32, blank=True, default='')
+    last_error = models.TextField(blank=True, default='',
+                                  verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Создано')
+    sent_at = models.DateTimeField(null=True, blank=True,
+                                   verbose_name='Отправлено')
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='outgoing_email_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.to} {self.subject[:15]}'
@@ -0,0 +1,99 @@
+import uuid
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+from .models import EMAIL_STATUSES, OutgoingEmail
+
+MAX_RETRY_DELAY = 60 * 60 * 24
+
+
+def enqueue_email(subject, message, from_email, recipient_list):
+    """
+    Stores email in the outbox instead of sending it, one row for every
+    recipient. Emails are sent by `send_outbox` command.
+    """
+    return OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(
+            subject=subject, body=message, from_email=from_email, to=to
+        )
+        for to in recipient_list
+    )
+
+
+def retry_delay(attempts, backoff):
+    return timedelta(
+        seconds=min(backoff * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+    )
+
+
+def claim_batch(batch_size, lease):
+    """
+    Marks up to batch_size due emails with a unique claim and postpones
+    them by lease seconds, so other workers skip them, and returns them.
+    If the worker dies, emails become due again after the lease.
+    """
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        status=EMAIL_STATUSES.pending.name, next_attempt_at__lte=now
+    )
+    ids = list(
+        due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[
+            :batch_size
+        ]
+    )
+    if not ids:
+        return []
+    claim = uuid.uuid4().hex
+    due.filter(id__in=ids).update(
+        claim=claim, next_attempt_at=now + timedelta(seconds=lease)
+    )
+    return list(OutgoingEmail.objects.filter(claim=claim))
+
+
+def send_batch(connection, batch_size=100, max_attempts=5, backoff=60,
+               lease=300):
+    """
+    Sends one batch of due emails over the open connection. Failed
+    emails are retried with exponential backoff, after max_attempts they
+    are marked as dead. Returns numbers of sent, postponed and dead emails
+    or None when there was nothing to send.
+    """
+    emails = claim_batch(batch_size, lease)
+    if not emails:
+        return None
+    sent, failed = [], []
+    for email in emails:
+        message = EmailMessage(
+            email.subject, email.body, email.from_email, [email.to],
+            connection=connection,
+        )
+        try:
+            # every message is sent separately, so a failure doesn't
+            # make already delivered messages of the batch to be resent
+            connection.send_messages([message])
+        except Exception as error:
+            email.last_error = f'{type(error).__name__}: {error}'
+            failed.append(email)
+        else:
+            sent.append(email.pk)
+
+    now = timezone.now()
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        status=EMAIL_STATUSES.sent.name, sent_at=now, claim='',
+    )
+    dead = 0
+    for email in failed:
+        email.attempts += 1
+        email.claim = ''
+        if email.attempts >= max_attempts:
+            email.status = EMAIL_STATUSES.dead.name
+            dead += 1
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts, backoff)
+    OutgoingEmail.objects.bulk_update(
+        failed,
+        ('attempts', 'claim', 'status', 'next_attempt_at', 'last_error'),
+    )
+    return len(sent), len(failed) - dead, dead
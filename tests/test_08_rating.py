@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что при создании отзыва обновляются сохраненные '
+            '`rating_sum`, `rating_count` и `rating` произведения'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            data={'score': 8}
+        )
+        assert response.status_code == 200
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (15, 3, 5), (
+            'Проверьте, что при изменении оценки отзыва обновляется рейтинг произведения'
+        )
+
+        moderator.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (11, 2, 5), (
+            'Проверьте, что при каскадном удалении отзывов вместе с автором '
+            'обновляется рейтинг произведения'
+        )
+
+        Review.objects.filter(title_id=title_id).delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (0, 0, None), (
+            'Проверьте, что без отзывов рейтинг произведения равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recalculate_ratings(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=100, rating_count=1, rating=100)
+        call_command('recalculate_ratings', chunk_size=1, verbosity=0)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает рейтинг'
+        )
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (0, 0, None)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_titles_list_without_aggregation(self, client, admin_client, admin):
+        create_reviews(admin_client, admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert not any('AVG(' in query['sql'].upper() for query in queries), (
+            'Проверьте, что `/api/v1/titles/` читает рейтинг из поля модели '
+            'и не выполняет агрегацию по отзывам'
+        )
@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Test09CursorPagination:
+
+    def collect_pages(self, client, url):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что при курсорной пагинации не выполняется подсчет '
+                'всех записей и в ответе нет параметра `count`'
+            )
+            pages.append(data)
+            url = data['next']
+        return pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        from reviews.models import Title
+
+        for index in range(25):
+            Title.objects.create(name=f'Произведение {index}', year=2000 + index % 3)
+        expected = list(
+            Title.objects.order_by('-year', '-id').values_list('id', flat=True)
+        )
+
+        pages = self.collect_pages(client, '/api/v1/titles/?pagination=cursor')
+        assert len(pages) == 3
+        ids = [title['id'] for page in pages for title in page['results']]
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` возвращает '
+            'все произведения в порядке `-year`, `-id` без пропусков и повторов'
+        )
+
+        previous = client.get(pages[2]['previous']).json()
+        assert [title['id'] for title in previous['results']] == expected[10:20], (
+            'Проверьте, что ссылка `previous` курсорной пагинации ведет '
+            'на предыдущую страницу'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            client.get(pages[1]['next'])
+        assert not any(
+            'COUNT(' in query['sql'].upper() or 'OFFSET' in query['sql'].upper()
+            for query in queries
+        ), 'Проверьте, что курсорная пагинация не использует COUNT и OFFSET'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_page_number_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `pagination=cursor` используется '
+            'постраничная пагинация'
+        )
@@ -0,0 +1,184 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test10TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_titles(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        shawshank = Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Фильм о надежде и побеге'
+        )
+
+        response = client.get('/api/v1/titles/?search=ПОБЕГ')
+        assert response.status_code == 200
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [shawshank.id], (
+            'Проверьте, что параметр `search` эндпоинта `/api/v1/titles/` '
+            'ищет без учета регистра, в том числе для кириллицы'
+        )
+
+        response = client.get('/api/v1/titles/?search=драма')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[1]['id']], (
+            'Проверьте, что параметр `search` ищет по описанию произведения'
+        )
+
+        shawshank.name = 'Зеленая миля'
+        shawshank.description = ''
+        shawshank.save()
+        response = client.get('/api/v1/titles/?search=побег')
+        assert response.json()['results'] == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_ranking_and_filters(self, client, admin_client):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        once = Title.objects.create(
+            name='Сказка', year=2001, description='Там есть принцессы, рыцари и драконы'
+        )
+        twice = Title.objects.create(
+            name='Драконы', year=1990, description='Драконы и только драконы'
+        )
+
+        response = client.get('/api/v1/titles/?search=драконы')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [twice.id, once.id], (
+            'Проверьте, что результаты поиска упорядочены по релевантности'
+        )
+
+        response = client.get('/api/v1/titles/?search=драконы&year=2001')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [once.id], (
+            'Проверьте, что параметр `search` сочетается с остальными фильтрами'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_genre_category_name_search(self, client, admin_client):
+        create_titles(admin_client)
+        admin_client.post('/api/v1/genres/', data={'name': 'Ужасы  Космоса', 'slug': 'space-horror'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/genres/?search=ужасы')
+        slugs = {genre['slug'] for genre in response.json()['results']}
+        assert slugs == {'horror', 'space-horror'}, (
+            'Проверьте, что поиск `/api/v1/genres/?search=` находит жанры '
+            'по началу названия без учета регистра'
+        )
+        assert not any('REGEXP' in query['sql'].upper() for query in queries), (
+            'Проверьте, что поиск жанров не использует регулярные выражения'
+        )
+
+        response = client.get('/api/v1/genres/?search=ужасы космоса')
+        assert [genre['slug'] for genre in response.json()['results']] == ['space-horror']
+
+        response = client.get('/api/v1/categories/?search=КНИ')
+        assert [category['slug'] for category in response.json()['results']] == ['books'], (
+            'Проверьте, что поиск `/api/v1/categories/?search=` находит категории '
+            'по началу названия без учета регистра'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_name_search_by_word_prefix(self, client, admin_client):
+        create_titles(admin_client)
+        admin_client.post('/api/v1/genres/', data={'name': 'Ужасы Космоса', 'slug': 'space-horror'})
+
+        response = client.get('/api/v1/genres/?search=КОСМ')
+        assert [genre['slug'] for genre in response.json()['results']] == ['space-horror'], (
+            'Проверьте, что поиск `/api/v1/genres/?search=` находит жанры '
+            'по началу любого слова названия'
+        )
+        response = client.get('/api/v1/genres/?search=осмос')
+        assert response.json()['results'] == [], (
+            'Проверьте, что поиск `/api/v1/genres/?search=` ищет по началу '
+            'слов, а не по любой части названия'
+        )
+
+        from reviews.models import Genre
+        from reviews.search import search_names
+
+        sql, params = search_names(Genre.objects.all(), 'косм').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        assert not any(re.match(r'SCAN (TABLE )?reviews_genre\b(?!_fts)', step) for step in plan), (
+            'Проверьте, что поиск жанров по началу слов использует индекс, '
+            f'а не просматривает всю таблицу: {plan}'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_fill_search_names(self, admin_client):
+        from django.core.management import call_command
+        from reviews.models import Category, Genre
+
+        create_titles(admin_client)
+        Genre.objects.update(search_name='')
+        Category.objects.filter(slug='books').update(search_name='')
+
+        call_command('fill_search_names', chunk_size=1, verbosity=0)
+
+        assert Genre.objects.get(slug='horror').search_name == 'ужасы', (
+            'Проверьте, что команда `fill_search_names` заполняет имена '
+            'для поиска у существующих жанров'
+        )
+        assert Category.objects.get(slug='books').search_name == 'книги', (
+            'Проверьте, что команда `fill_search_names` заполняет имена '
+            'для поиска у существующих категорий'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_search_match_once(self, client, admin_client):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        Title.objects.create(name='Драконы', year=1990, description='Драконы')
+        client.get('/api/v1/titles/?search=драконы')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/?search=драконы&page=1')
+        assert response.status_code == 200
+        sqls = [query['sql'] for query in queries]
+        assert not any('sqlite_master' in sql for sql in sqls), (
+            'Проверьте, что наличие поискового индекса не проверяется '
+            'при каждом запросе'
+        )
+        assert all(sql.upper().count('MATCH') <= 1 for sql in sqls), (
+            'Проверьте, что условие MATCH выполняется в запросе один раз '
+            'и используется и для отбора, и для ранжирования'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_search_with_cursor_pagination(self, client, admin_client):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        once = Title.objects.create(
+            name='Сказка', year=2020, description='Там есть принцессы и драконы'
+        )
+        twice = Title.objects.create(
+            name='Драконы', year=1990, description='Драконы и только драконы'
+        )
+
+        response = client.get('/api/v1/titles/?search=драконы&pagination=cursor')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 2, (
+            'Проверьте, что для поиска с `pagination=cursor` используется '
+            'пагинация по номеру страницы'
+        )
+        assert [title['id'] for title in data['results']] == [twice.id, once.id], (
+            'Проверьте, что результаты поиска с `pagination=cursor` '
+            'упорядочены по релевантности'
+        )
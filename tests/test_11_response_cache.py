@@ -0,0 +1,102 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews, create_titles
+
+
+class Test11ResponseCache:
+
+    def assert_cached(self, client, url):
+        first = client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            second = client.get(url)
+        assert second.status_code == first.status_code == 200
+        assert second.json() == first.json()
+        assert len(queries) == 0, (
+            f'Проверьте, что повторный GET запрос `{url}` без изменений '
+            'в данных отдается из кэша без запросов к БД'
+        )
+        return second.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cache_invalidation(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert self.assert_cached(client, url)['rating'] == 4
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            data={'score': 8}
+        )
+        assert client.get(url).json()['rating'] == 5, (
+            'Проверьте, что кэш произведений сбрасывается при изменении отзыва'
+        )
+
+        self.assert_cached(client, '/api/v1/genres/')
+        admin_client.post('/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'})
+        slugs = [genre['slug'] for genre in client.get('/api/v1/genres/').json()['results']]
+        assert 'western' in slugs, (
+            'Проверьте, что кэш жанров сбрасывается при добавлении жанра'
+        )
+
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        self.assert_cached(client, reviews_url)
+        admin.username = 'RenamedAdmin'
+        admin.save()
+        authors = {review['author'] for review in client.get(reviews_url).json()['results']}
+        assert 'RenamedAdmin' in authors, (
+            'Проверьте, что кэш отзывов сбрасывается при изменении пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_filebased_cache(self, client, admin_client, settings, tmp_path):
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        titles, _, _ = create_titles(admin_client)
+        self.assert_cached(client, '/api/v1/titles/?year=2000')
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Новое имя'})
+        results = client.get('/api/v1/titles/?year=2000').json()['results']
+        assert results[0]['name'] == 'Новое имя'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_conditional_get(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        assert etag and last_modified, (
+            f'Проверьте, что ответ на GET запрос `{url}` содержит заголовки '
+            '`ETag` и `Last-Modified`'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается статус 304'
+        )
+        assert len(queries) == 0, (
+            'Проверьте, что для ответа 304 не выполняются запросы к БД'
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, (
+            'Проверьте, что при `If-Modified-Since` не раньше `Last-Modified` '
+            'возвращается статус 304'
+        )
+
+        other_title = f'/api/v1/titles/{titles[1]["id"]}/'
+        other_etag = client.get(other_title)['ETag']
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'text': 'Новый текст'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что после изменения отзыва меняется `ETag` списка отзывов'
+        )
+        response = client.get(other_title, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == 304, (
+            'Проверьте, что изменение отзыва не меняет `ETag` другого произведения'
+        )
@@ -0,0 +1,233 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def snapshot():
+    from reviews.models import Comment, Genre, GenreTitle, Review, Title
+    from users.models import User
+
+    return {
+        'titles': list(Title.objects.order_by('pk').values_list(
+            'pk', 'name', 'category_id', 'rating_sum', 'rating_count', 'rating')),
+        'genres': list(Genre.objects.order_by('pk').values_list('pk', 'slug', 'search_name')),
+        'genre_titles': list(GenreTitle.objects.order_by('pk').values_list('pk', 'title_id', 'genre_id')),
+        'users': list(User.objects.order_by('pk').values_list('pk', 'username')),
+        'reviews': list(Review.objects.order_by('pk').values_list('pk', 'title_id', 'author_id', 'score')),
+        'comments': list(Comment.objects.order_by('pk').values_list('pk', 'review_id', 'author_id')),
+    }
+
+
+class Test12ImportData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_import(self):
+        call_command('importdata', verbosity=0)
+        expected = snapshot()
+        call_command('flush', interactive=False, verbosity=0)
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('importdata', bulk=True, batch_size=50, verbosity=0)
+        assert snapshot() == expected, (
+            'Проверьте, что `importdata --bulk` импортирует те же данные, '
+            'что и построчный импорт, включая рейтинг и имя для поиска'
+        )
+        assert len(queries) < 100, (
+            'Проверьте, что `importdata --bulk` не выполняет запросы для каждой строки'
+        )
+
+        call_command('importdata', bulk=True, verbosity=0)
+        assert snapshot() == expected, (
+            'Проверьте, что повторный импорт не дублирует записи'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_parallel_import(self):
+        from reviews.management.scheduler import model_dependencies
+        from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+        from users.models import User
+
+        dependencies = model_dependencies(
+            (Category, Genre, Title, GenreTitle, User, Review, Comment)
+        )
+        assert dependencies[Category] == dependencies[Genre] == dependencies[User] == set()
+        assert dependencies[GenreTitle] == {Genre, Title}
+        assert dependencies[Review] == {Title, User}
+
+        call_command('importdata', verbosity=0, no_checkpoint=True)
+        expected = snapshot()
+        call_command('flush', interactive=False, verbosity=0)
+
+        for bulk in (True, False):
+            call_command(
+                'importdata', bulk=bulk, jobs=4, batch_size=10,
+                no_checkpoint=True, verbosity=0,
+            )
+            assert snapshot() == expected, (
+                'Проверьте, что `importdata --jobs` импортирует те же данные, '
+                'что и последовательный импорт'
+            )
+            call_command('flush', interactive=False, verbosity=0)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_resume_gzip_and_stdin(self, tmp_path):
+        import gzip
+        import io
+        import json
+
+        from django.core.management.base import CommandError
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        checkpoint = tmp_path / 'checkpoint.json'
+        data = 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n3,Ужасы,horror\n'
+        genre_file = tmp_path / 'genre.csv.gz'
+        with gzip.open(genre_file, 'wt', encoding='utf-8') as csv_file:
+            csv_file.write(data)
+        call_command(
+            'importdata', models='Genre', data_dir=str(tmp_path),
+            checkpoint=str(checkpoint), verbosity=0,
+        )
+        assert Genre.objects.count() == 3, (
+            'Проверьте, что `importdata` импортирует gzip-файлы из `--data-dir`'
+        )
+        assert not checkpoint.exists(), (
+            'Проверьте, что после успешного импорта файл прогресса удаляется'
+        )
+
+        title_file = tmp_path / 'genre_title.csv'
+        title_file.write_text(
+            'id,title_id,genre_id\n1,1,1\n2,1,2\n3,1,999\n4,1,3\n', encoding='utf-8'
+        )
+        Title.objects.create(id=1, name='Произведение', year=2000)
+        with pytest.raises(CommandError):
+            call_command(
+                'importdata', models='GenreTitle', bulk=True, batch_size=2,
+                file=[f'GenreTitle={title_file}'], checkpoint=str(checkpoint),
+                verbosity=0,
+            )
+        assert GenreTitle.objects.count() == 2, (
+            'Проверьте, что пачки, импортированные до ошибки, сохраняются в БД'
+        )
+        assert json.loads(checkpoint.read_text())['GenreTitle']['rows'] == 2
+
+        GenreTitle.objects.all().delete()
+        with pytest.raises(CommandError):
+            call_command(
+                'importdata', models='GenreTitle', bulk=True, batch_size=2,
+                file=[f'GenreTitle={title_file}'], no_checkpoint=True,
+                verbosity=0,
+            )
+        assert GenreTitle.objects.count() == 0, (
+            'Проверьте, что `importdata --bulk --no-checkpoint` импортирует '
+            'файл в одной транзакции'
+        )
+
+        title_file.write_text(
+            'id,title_id,genre_id\n1,1,1\n2,1,2\n3,1,3\n4,1,3\n', encoding='utf-8'
+        )
+        call_command(
+            'importdata', models='GenreTitle', bulk=True, batch_size=2,
+            file=[f'GenreTitle={title_file}'], checkpoint=str(checkpoint),
+            resume=True, verbosity=0,
+        )
+        assert sorted(GenreTitle.objects.values_list('pk', flat=True)) == [3, 4], (
+            'Проверьте, что `importdata --resume` продолжает импорт '
+            'с первой незафиксированной пачки'
+        )
+
+        stdin = io.TextIOWrapper(io.BytesIO('id,name,slug\n1,Фильм,movie\n'.encode('utf-8')))
+        call_command(
+            'importdata', models='Category', file=['Category=-'], stdin=stdin,
+            checkpoint=str(checkpoint), verbosity=0,
+        )
+        assert list(Category.objects.values_list('slug', flat=True)) == ['movie'], (
+            'Проверьте, что `importdata --file Model=-` читает данные из stdin'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_upsert(self, tmp_path):
+        from reviews.models import Genre, Review, Title
+
+        options = {
+            'checksums': str(tmp_path / 'checksums.json'),
+            'no_checkpoint': True,
+            'verbosity': 0,
+        }
+        call_command('importdata', upsert=True, **options)
+        genre_file = tmp_path / 'genre.csv'
+        genre_file.write_text(
+            'id,name,slug\n1,Новая драма,drama\n2,Комедия,comedy\n', encoding='utf-8'
+        )
+        review_file = tmp_path / 'review.csv'
+        review_file.write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Ставлю десять звёзд!,100,1,2020-01-13T23:20:02.422Z\n',
+            encoding='utf-8'
+        )
+        rating = Title.objects.get(pk=1).rating_sum
+        score = Review.objects.get(pk=1).score
+
+        files = [f'Genre={genre_file}', f'Review={review_file}']
+        with CaptureQueriesContext(connection) as queries:
+            call_command('importdata', upsert=True, file=files, models='Genre,Review', **options)
+        genre_updates = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('UPDATE "reviews_genre"')
+        ]
+        assert len(genre_updates) == 1 and genre_updates[0].endswith('IN (1)'), (
+            'Проверьте, что `importdata --upsert` обновляет одним запросом '
+            'только записи, значения полей которых изменились'
+        )
+        genre = Genre.objects.get(pk=1)
+        assert (genre.name, genre.search_name) == ('Новая драма', 'новая драма'), (
+            'Проверьте, что `importdata --upsert` обновляет изменившиеся записи'
+        )
+        assert Title.objects.get(pk=1).rating_sum == rating - score + 1, (
+            'Проверьте, что после `importdata --upsert` пересчитывается рейтинг'
+        )
+
+        Genre.objects.filter(pk=1).update(name='Изменено в БД')
+        with CaptureQueriesContext(connection) as queries:
+            call_command('importdata', upsert=True, file=files, models='Genre,Review', **options)
+        assert Genre.objects.get(pk=1).name == 'Изменено в БД', (
+            'Проверьте, что `importdata --upsert` пропускает файлы, '
+            'которые не изменились с прошлого импорта'
+        )
+        assert not any('reviews_genre' in query['sql'] for query in queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_parallel_parsing(self, tmp_path):
+        import io
+
+        from reviews.management.streaming import csv_records
+        from reviews.models import Title
+
+        text = 'id,name\r\n1,"Первая\r\nстрока"\r\n\r\n2,"Кавычки ""внутри"""\r\n'
+        assert list(csv_records(io.StringIO(text, newline=''))) == [
+            'id,name\r\n',
+            '1,"Первая\r\nстрока"\r\n',
+            '2,"Кавычки ""внутри"""\r\n',
+        ], (
+            'Проверьте, что csv разбивается на записи с учетом переносов '
+            'строк внутри кавычек'
+        )
+
+        title_file = tmp_path / 'title.csv'
+        title_file.write_text(
+            'id,name,year,category\n'
+            + ''.join(
+                f'{index},"Название\n{index}, ""часть"" {index}",2000,\n'
+                for index in range(1, 26)
+            ),
+            encoding='utf-8',
+        )
+        call_command(
+            'importdata', models='Title', bulk=True, jobs=4, batch_size=4,
+            file=[f'Title={title_file}'], no_checkpoint=True, verbosity=0,
+        )
+        assert Title.objects.count() == 25
+        assert Title.objects.get(pk=7).name == 'Название\n7, "часть" 7', (
+            'Проверьте, что при параллельном импорте пачки строк csv '
+            'разбираются корректно'
+        )
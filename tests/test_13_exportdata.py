@@ -0,0 +1,40 @@
+import csv
+import gzip
+
+import pytest
+from django.core.management import call_command
+
+from .test_12_importdata import snapshot
+
+
+class Test13ExportData:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_import_roundtrip(self, tmp_path):
+        call_command('importdata', no_checkpoint=True, verbosity=0)
+        expected = snapshot()
+
+        call_command('exportdata', output_dir=str(tmp_path), chunk_size=7, verbosity=0)
+        with open(tmp_path / 'review.csv', encoding='utf-8', newline='') as csv_file:
+            header = next(csv.reader(csv_file))
+        assert header == ['id', 'title_id', 'text', 'author', 'score', 'pub_date'], (
+            'Проверьте, что `exportdata` сохраняет файлы в формате static/data'
+        )
+
+        call_command(
+            'exportdata', output_dir=str(tmp_path / 'gz'), gzip=True, jobs=3,
+            verbosity=0,
+        )
+        with gzip.open(tmp_path / 'gz' / 'genre.csv.gz', 'rt', encoding='utf-8') as csv_file:
+            assert csv_file.readline().strip() == 'id,name,slug'
+
+        for data_dir in (tmp_path, tmp_path / 'gz'):
+            call_command('flush', interactive=False, verbosity=0)
+            call_command(
+                'importdata', data_dir=str(data_dir), no_checkpoint=True,
+                verbosity=0,
+            )
+            assert snapshot() == expected, (
+                'Проверьте, что данные, выгруженные `exportdata`, '
+                'импортируются `importdata` без изменений'
+            )
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test14TitlesExport:
+    url = '/api/v1/titles/export/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_permissions(self, client, user_client, moderator_client):
+        for api_client, code in ((client, 401), (user_client, 403), (moderator_client, 403)):
+            response = api_client.get(self.url)
+            assert response.status_code == code, (
+                f'Проверьте, что GET запрос `{self.url}` доступен только '
+                f'администратору, иначе возвращается статус {code}'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_ndjson(self, admin_client):
+        from api.views import TitleViewSet
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        for index in range(10):
+            Title.objects.create(name=f'Произведение {index}', year=1990)
+        detail = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+
+        TitleViewSet.export_chunk_size, chunk_size = 5, TitleViewSet.export_chunk_size
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.get(self.url)
+                rows = [
+                    json.loads(line)
+                    for line in b''.join(response.streaming_content).decode().splitlines()
+                ]
+        finally:
+            TitleViewSet.export_chunk_size = chunk_size
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert [row['id'] for row in rows] == sorted(
+            Title.objects.values_list('id', flat=True)
+        ), (
+            f'Проверьте, что `{self.url}` возвращает все произведения построчно'
+        )
+        assert rows[0] == detail, (
+            'Проверьте, что строки выгрузки совпадают с ответом `/api/v1/titles/{id}/`'
+        )
+        # user lookup, then titles and genres for 3 full chunks and final empty chunk
+        assert len(queries) <= 1 + 3 * 2 + 1, (
+            'Проверьте, что жанры и категории выбираются одним запросом на пачку'
+        )
@@ -0,0 +1,129 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .common import create_comments, create_reviews
+
+
+class Test15Batch:
+    url = '/api/v1/batch/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_batch_get(self, admin_client, admin):
+        client = APIClient()
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        paths = [
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            '/api/v1/titles/100500/',
+        ]
+        response = client.post(
+            self.url, data=[{'path': path} for path in paths], format='json'
+        )
+        assert response.status_code == 200, (
+            f'Проверьте, что POST запрос `{self.url}` возвращает статус 200'
+        )
+        results = response.json()
+        assert [result['status'] for result in results] == [200, 200, 200, 404], (
+            'Проверьте, что для каждого запроса пачки возвращается его статус'
+        )
+        for path, result in zip(paths[:3], results):
+            assert result['body'] == client.get(path).json(), (
+                f'Проверьте, что ответ на `{path}` в пачке совпадает с обычным'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_batch_auth(self, admin_client, admin, settings):
+        from api.authentication import user_cache
+
+        client = APIClient()
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title_id = titles[1]['id']
+        data = [
+            {'method': 'POST', 'path': f'/api/v1/titles/{title_id}/reviews/',
+             'body': {'text': 'Из пачки', 'score': 7}},
+            {'path': f'/api/v1/titles/{title_id}/reviews/'},
+            {'path': f'/api/v1/titles/{title_id}/reviews/?page=2'},
+        ]
+        results = client.post(self.url, data=data, format='json').json()
+        assert results[0]['status'] == 401, (
+            'Проверьте, что запросы пачки выполняются с правами вызывающего'
+        )
+
+        user_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(self.url, data=data, format='json')
+        results = response.json()
+        assert results[0]['status'] == 201
+        assert results[0]['body']['author'] == admin.username
+        assert results[1]['body']['count'] == 1
+        user_queries = [
+            query for query in queries
+            if 'FROM "users_user" WHERE "users_user"."username"' in query['sql']
+        ]
+        assert len(user_queries) == 1, (
+            'Проверьте, что пользователь определяется один раз на всю пачку'
+        )
+        title_queries = [
+            query for query in queries
+            if query['sql'].startswith('SELECT') and 'FROM "reviews_title"' in query['sql']
+            and 'COUNT' not in query['sql']
+        ]
+        assert len(title_queries) == 2, (
+            'Проверьте, что произведение ищется повторно только после '
+            'изменяющего запроса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_batch_validation(self, admin_client):
+        for data in (
+            [{'path': '/admin/'}],
+            [{'path': '/api/v1/batch/'}],
+            [{'method': 'OPTIONS', 'path': '/api/v1/titles/'}],
+            [{'path': '/api/v1/titles/'}] * 21,
+            {'path': '/api/v1/titles/'},
+        ):
+            response = admin_client.post(self.url, data=data, format='json')
+            assert response.status_code == 400, (
+                f'Проверьте, что POST запрос `{self.url}` с некорректными '
+                'данными возвращает статус 400'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_batch_conditional_headers(self, admin_client, admin):
+        client = APIClient()
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        path = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(path)['ETag']
+        response = client.post(
+            self.url, data=[{'path': path}], format='json',
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        result = response.json()[0]
+        assert result['status'] == 200 and result['body']['id'] == titles[0]['id'], (
+            'Проверьте, что условные заголовки запроса пачки не передаются '
+            'в запросы пачки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_batch_write_transaction(self, monkeypatch):
+        from rest_framework.exceptions import APIException
+
+        from users.models import User
+
+        def fail(*args, **kwargs):
+            raise APIException('Почта недоступна')
+        monkeypatch.setattr('api.views.enqueue_email', fail)
+        response = APIClient().post(self.url, data=[{
+            'method': 'POST', 'path': '/api/v1/auth/signup/',
+            'body': {'username': 'batch_user', 'email': 'batch@yamdb.fake'},
+        }], format='json')
+        assert response.json()[0]['status'] == 500
+        assert not User.objects.filter(username='batch_user').exists(), (
+            'Проверьте, что запрос пачки, завершившийся ошибкой, не '
+            'оставляет частично записанных данных'
+        )
@@ -0,0 +1,116 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test16TitlesBulk:
+    url = '/api/v1/titles/'
+
+    def bulk_data(self, count, start=0):
+        return [
+            {'name': f'Произведение {index}', 'year': 1990 + index % 10,
+             'genre': ['horror', 'drama'], 'category': 'films',
+             'description': f'Описание {index}'}
+            for index in range(start, start + count)
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create(self, admin_client):
+        from reviews.models import GenreTitle, Title
+
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as small:
+            response = admin_client.post(self.url, data=self.bulk_data(5), format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{self.url}` со списком произведений '
+            'возвращает статус 201'
+        )
+        with CaptureQueriesContext(connection) as large:
+            response = admin_client.post(self.url, data=self.bulk_data(50, 5), format='json')
+        assert response.status_code == 201
+        assert len(large) == len(small), (
+            'Проверьте, что число запросов к БД при массовом создании '
+            'произведений не зависит от их количества'
+        )
+        data = response.json()
+        assert len(data) == 50 and Title.objects.count() == 57
+        assert GenreTitle.objects.filter(title__name__startswith='Произведение').count() == 110
+        detail = admin_client.get(f'{self.url}{data[7]["id"]}/').json()
+        assert detail['name'] == 'Произведение 12'
+        assert sorted(genre['slug'] for genre in detail['genre']) == ['drama', 'horror']
+        assert detail['category']['slug'] == 'films'
+        assert sorted(data[7]['genre']) == ['drama', 'horror'] and data[7]['category'] == 'films'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_create_errors(self, admin_client, user_client, client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        data = self.bulk_data(4)
+        data[2]['genre'] = ['horror', 'western']
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 400, (
+            f'Проверьте, что POST запрос `{self.url}` со списком, содержащим '
+            'некорректные произведения, возвращает статус 400'
+        )
+        errors = response.json()
+        assert len(errors) == 4 and errors[0] == {}
+        assert errors[1] == {} and 'genre' in errors[2], (
+            'Проверьте, что ошибки возвращаются для каждого элемента списка'
+        )
+        assert Title.objects.count() == 2
+
+        data = self.bulk_data(4)
+        data[1]['name'], data[1]['year'] = titles[0]['name'], titles[0]['year']
+        data[3]['name'], data[3]['year'] = data[0]['name'], data[0]['year']
+        errors = admin_client.post(self.url, data=data, format='json').json()
+        assert len(errors) == 4 and errors[0] == errors[2] == {}
+        assert errors[1] and errors[3], (
+            'Проверьте, что нельзя создать существующее произведение или '
+            'одно произведение дважды'
+        )
+        assert Title.objects.count() == 2
+
+        assert user_client.post(self.url, data=self.bulk_data(2), format='json').status_code == 403
+        assert client.post(
+            self.url, data=self.bulk_data(2), content_type='application/json'
+        ).status_code == 401
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_partial_update(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        data = [
+            {'id': titles[0]['id'], 'name': 'Новое имя'},
+            {'id': titles[1]['id'], 'genre': ['comedy', 'horror'], 'category': 'films'},
+        ]
+        assert user_client.patch(self.url, data=data, format='json').status_code == 403
+        response = admin_client.patch(self.url, data=data, format='json')
+        assert response.status_code == 200, (
+            f'Проверьте, что PATCH запрос `{self.url}` со списком произведений '
+            'возвращает статус 200'
+        )
+        first = admin_client.get(f'{self.url}{titles[0]["id"]}/').json()
+        second = admin_client.get(f'{self.url}{titles[1]["id"]}/').json()
+        assert first['name'] == 'Новое имя' and first['year'] == 2000
+        assert len(first['genre']) == 2
+        assert sorted(genre['slug'] for genre in second['genre']) == ['comedy', 'horror']
+        assert second['category']['slug'] == 'films'
+
+        response = admin_client.patch(self.url, data=[
+            {'id': titles[0]['id'], 'year': 2001},
+            {'id': 100500, 'year': 2001},
+            {'id': titles[0]['id'], 'year': 2002},
+        ], format='json')
+        assert response.status_code == 400
+        assert response.json()[0] == {} and response.json()[1] and response.json()[2]
+        assert admin_client.get(f'{self.url}{titles[0]["id"]}/').json()['year'] == 2000
+
+        response = admin_client.patch(self.url, data=[
+            {'id': titles[0]['id'], 'name': titles[1]['name'], 'year': titles[1]['year'],
+             'category': 'films'},
+        ], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что массовое изменение не может создать дубликат произведения'
+        )
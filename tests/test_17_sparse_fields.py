@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test17SparseFields:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return response.json(), [query['sql'] for query in queries]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_fields(self, admin_client, admin, settings):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+
+        data, queries = self.get(admin_client, '/api/v1/titles/?fields=id,name,rating')
+        assert [set(title) for title in data['results']] == [{'id', 'name', 'rating'}] * 2, (
+            'Проверьте, что параметр `fields` ограничивает поля ответа `/api/v1/titles/`'
+        )
+        title_queries = [sql for sql in queries if 'FROM "reviews_title"' in sql]
+        assert title_queries and not any('"description"' in sql for sql in title_queries), (
+            'Проверьте, что незапрошенные столбцы не выбираются из БД'
+        )
+        assert not any('reviews_genre' in sql for sql in queries), (
+            'Проверьте, что жанры не выбираются, если поле `genre` не запрошено'
+        )
+
+        full, queries = self.get(admin_client, '/api/v1/titles/')
+        assert len([sql for sql in queries if 'reviews_genre' in sql]) == 1, (
+            'Проверьте, что жанры всех произведений выбираются одним запросом'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        data, _ = self.get(admin_client, f'{url}?omit=description,genre')
+        expected = {key: value for key, value in self.get(admin_client, url)[0].items()
+                    if key not in ('description', 'genre')}
+        assert data == expected, (
+            'Проверьте, что параметр `omit` исключает поля из ответа'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_other_resources(self, admin_client, admin, settings):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        data, queries = self.get(admin_client, f'{reviews_url}?fields=id,score')
+        assert [set(review) for review in data['results']] == [{'id', 'score'}] * 3
+        assert not any('"text"' in sql for sql in queries if 'FROM "reviews_review"' in sql)
+        assert not any('FROM "users_user"' in sql for sql in queries[1:]), (
+            'Проверьте, что авторы не выбираются, если поле `author` не запрошено'
+        )
+
+        data, queries = self.get(admin_client, f'{reviews_url}?omit=text')
+        review_queries = [
+            sql for sql in queries if 'FROM "reviews_review"' in sql and 'COUNT' not in sql
+        ]
+        assert len(review_queries) == 1 and '"users_user"' in review_queries[0], (
+            'Проверьте, что авторы выбираются вместе с отзывами одним запросом'
+        )
+        assert data['results'][0]['author'] == admin.username
+
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/?fields=text'
+        data, _ = self.get(admin_client, comments_url)
+        assert [comment['text'] for comment in data['results']] == ['qwerty', 'qwerty123', 'qwerty321']
+
+        data, _ = self.get(admin_client, '/api/v1/users/?fields=username,role')
+        assert all(set(user) == {'username', 'role'} for user in data['results'])
+        data, _ = self.get(admin_client, '/api/v1/genres/?omit=name')
+        assert all(set(genre) == {'slug'} for genre in data['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_unknown_fields(self, client):
+        for url in ('/api/v1/titles/?fields=id,secret', '/api/v1/categories/?omit=password'):
+            response = client.get(url)
+            assert response.status_code == 400, (
+                f'Проверьте, что GET запрос `{url}` с неизвестным полем '
+                'возвращает статус 400'
+            )
@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments
+
+
+class Test18ValuesSerializers:
+
+    def get_both(self, client, url, viewset, monkeypatch):
+        fast = client.get(url)
+        with monkeypatch.context() as patch:
+            patch.setattr(viewset, 'values_list', False)
+            slow = client.get(url)
+        assert fast.status_code == slow.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        assert fast.content == slow.content, (
+            f'Проверьте, что ответ `{url}`, построенный из values(), '
+            'совпадает с ответом сериализатора DRF'
+        )
+        return fast.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_same_output(self, client, admin_client, admin, settings, monkeypatch):
+        from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+        from reviews.models import Title
+
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        Title.objects.create(name='Без категории', year=2000)
+        title_urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?fields=id,genre,rating',
+            '/api/v1/titles/?omit=genre',
+            '/api/v1/titles/?pagination=cursor',
+            '/api/v1/titles/?search=драма&genre=drama',
+        )
+        for url in title_urls:
+            data = self.get_both(client, url, TitleViewSet, monkeypatch)
+        assert data['results'], (
+            'Проверьте, что поиск по произведениям работает с values()'
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for url in (reviews_url, f'{reviews_url}?pagination=cursor', f'{reviews_url}?fields=author'):
+            self.get_both(client, url, ReviewViewSet, monkeypatch)
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        data = self.get_both(client, comments_url, CommentViewSet, monkeypatch)
+        assert len(data['results']) == 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_compiled_serializer(self, admin_client, admin):
+        from api.serializers import ReadOnlyTitleSerializer, ReviewSerializer
+        from api.values import compile_serializer
+        from reviews.models import Review, Title
+
+        create_comments(admin_client, admin)
+        for serializer_class, queryset in (
+            (ReadOnlyTitleSerializer, Title.objects.order_by('id')),
+            (ReviewSerializer, Review.objects.order_by('id')),
+        ):
+            compiled = compile_serializer(serializer_class)
+            assert compiled.render(compiled.values(queryset)) == (
+                serializer_class(queryset, many=True).data
+            )
+        compiled = compile_serializer(ReadOnlyTitleSerializer, ['name'])
+        assert compiled.render(compiled.values(Title.objects.all())) == [
+            {'name': name} for name in Title.objects.values_list('name', flat=True)
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_benchmark_command(self, capsys):
+        from reviews.models import Title
+
+        call_command('benchserializers', objects=20, repeat=1)
+        output = capsys.readouterr().out
+        assert output.count('объектов/с') == 6, (
+            'Проверьте, что команда `benchserializers` выводит скорость '
+            'обоих способов сериализации'
+        )
+        assert not Title.objects.exists(), (
+            'Проверьте, что тестовые данные команды `benchserializers` удаляются'
+        )
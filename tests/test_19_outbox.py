@@ -0,0 +1,91 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+
+class FlakyBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any('broken' in to for to in message.to):
+                raise ConnectionError('Сервер недоступен')
+        return super().send_messages(messages)
+
+
+class Test19Outbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_uses_outbox(self, client, settings, tmp_path):
+        from users.models import OutgoingEmail, User
+
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'outbox@yamdb.fake', 'username': 'outbox_user'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что при POST запросе `{self.url_signup}` письмо не '
+            'отправляется во время запроса'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == data['email'] and email.status == 'pending', (
+            f'Проверьте, что при POST запросе `{self.url_signup}` письмо '
+            'сохраняется в очередь исходящих писем'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        call_command('send_outbox')
+        sent = ''.join(path.read_text() for path in tmp_path.iterdir())
+        code = User.objects.get(username=data['username']).confirmation_code
+        assert code in sent and data['email'] in sent, (
+            'Проверьте, что команда `send_outbox` отправляет письма из очереди'
+        )
+        email.refresh_from_db()
+        assert email.status == 'sent' and email.sent_at is not None
+
+        call_command('send_outbox')
+        assert sent == ''.join(path.read_text() for path in tmp_path.iterdir()), (
+            'Проверьте, что отправленные письма не отправляются повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_and_dead_letters(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import enqueue_email
+
+        settings.EMAIL_BACKEND = 'tests.test_19_outbox.FlakyBackend'
+        FlakyBackend.opened = 0
+        outbox_before_count = len(mail.outbox)
+        recipients = [f'user{index}@yamdb.fake' for index in range(250)]
+        enqueue_email('Код', 'Текст', 'register@yamdb.ru', recipients + ['broken@yamdb.fake'])
+
+        call_command('send_outbox', batch_size=100, max_attempts=2)
+        assert len(mail.outbox) == outbox_before_count + 250
+        assert FlakyBackend.opened == 1, (
+            'Проверьте, что все письма отправляются через одно соединение'
+        )
+        broken = OutgoingEmail.objects.get(to='broken@yamdb.fake')
+        assert broken.status == 'pending' and broken.attempts == 1
+        assert 'Сервер недоступен' in broken.last_error
+        assert OutgoingEmail.objects.filter(status='sent').count() == 250
+
+        call_command('send_outbox', max_attempts=2)
+        broken.refresh_from_db()
+        assert broken.attempts == 1, (
+            'Проверьте, что повторная попытка откладывается'
+        )
+
+        OutgoingEmail.objects.filter(pk=broken.pk).update(next_attempt_at=broken.created_at)
+        call_command('send_outbox', max_attempts=2)
+        broken.refresh_from_db()
+        assert broken.status == 'dead' and broken.attempts == 2, (
+            'Проверьте, что письмо перестает отправляться после max_attempts попыток'
+        )
+        assert len(mail.outbox) == outbox_before_count + 250
@@ -0,0 +1,100 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class Test20AuthCache:
+
+    def user_queries(self, client, url, method='get', **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, **kwargs)
+        return response, [
+            query['sql'] for query in queries
+            if 'FROM "users_user" WHERE "users_user"."username"' in query['sql']
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_no_auth_queries(self, admin_client, user_client):
+        admin_client.get('/api/v1/titles/')
+        response, queries = self.user_queries(admin_client, '/api/v1/categories/')
+        assert response.status_code == 200
+        assert not queries, (
+            'Проверьте, что повторные запросы с тем же токеном не обращаются '
+            'к БД за пользователем'
+        )
+        response, queries = self.user_queries(
+            user_client, '/api/v1/titles/', method='post', data={}
+        )
+        assert response.status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation(self, admin_client, user, user_client):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что кэш пользователя сбрасывается при изменении роли'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'RenamedUser'}
+        )
+        assert response.status_code == 200
+        response = user_client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что после смены имени пользователя старый токен '
+            'больше не действует'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_inactive_and_invalid(self, user, user_client):
+        from api.authentication import token_cache
+
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что деактивированный пользователь не проходит '
+            'аутентификацию'
+        )
+
+        size = len(token_cache)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer invalid.token.value')
+        assert client.get('/api/v1/users/me/').status_code == 401
+        assert len(token_cache) == size, (
+            'Проверьте, что невалидные токены не кэшируются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_expired_cached_token(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        token = AccessToken.for_user(user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert client.get('/api/v1/users/me/').status_code == 200
+
+        time.sleep(2)
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что срок действия токена из кэша проверяется '
+            'по времени текущего запроса'
+        )
+
+    def test_05_lru(self):
+        from api.authentication import LRUCache
+
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+        expired = LRUCache(2, timeout=-1)
+        expired.set('a', 1)
+        assert expired.get('a') is None
@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .common import create_titles
+
+
+def role_client(user):
+    from api.tokens import RoleAccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+    return client
+
+
+class Test21RoleTokens:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_obtain_role_token(self, client, user, settings):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user.confirmation_code = 'confirmation-code'
+        user.save()
+        data = {'username': user.username, 'confirmation_code': user.confirmation_code}
+        token = AccessToken(client.post('/api/v1/auth/token/', data=data).json()['token'])
+        assert 'role' not in token, (
+            'Проверьте, что по умолчанию токен не содержит роль пользователя'
+        )
+        settings.API_ROLE_TOKENS = True
+        token = AccessToken(client.post('/api/v1/auth/token/', data=data).json()['token'])
+        assert token['role'] == 'user' and token['is_superuser'] is False, (
+            'Проверьте, что при API_ROLE_TOKENS = True токен содержит роль пользователя'
+        )
+        assert token['uid'] == user.pk and token['role_version'] == user.role_version
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reads_without_user_row(self, admin, user):
+        from api.authentication import user_cache
+
+        admin_client = role_client(admin)
+        admin_client.get('/api/v1/users/')
+        user_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get('/api/v1/users/?fields=username')
+        assert response.status_code == 200
+        assert not any(
+            'FROM "users_user" WHERE "users_user"."username" =' in query['sql']
+            for query in queries
+        ), (
+            'Проверьте, что права на чтение проверяются по токену без '
+            'обращения к БД за пользователем'
+        )
+        assert role_client(user).get('/api/v1/users/').status_code == 403
+        assert role_client(admin).get('/api/v1/users/me/').json()['username'] == admin.username
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_revocation(self, admin):
+        admin_client = role_client(admin)
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что после смены роли токен с ролью отзывается'
+        )
+        assert admin_client.post('/api/v1/genres/', data={'name': 'Жанр', 'slug': 'genre'}).status_code == 401
+        assert role_client(admin).get('/api/v1/users/').status_code == 403
+
+        admin.bio = 'Новое описание'
+        admin.save()
+        assert role_client(admin).get('/api/v1/users/me/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_writes(self, admin_client, user, moderator):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = role_client(user).post(url, data={'text': 'Текст', 'score': 7})
+        assert response.status_code == 201, (
+            'Проверьте, что с токеном с ролью можно создавать отзывы'
+        )
+        review_url = f'{url}{response.json()["id"]}/'
+        assert role_client(user).patch(review_url, data={'score': 8}).status_code == 200
+        assert role_client(moderator).delete(review_url).status_code == 204
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test22ParentResolver:
+
+    def selects(self, queries, table):
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_create_queries(self, admin_client, admin, user_client):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        user_client.get('/api/v1/users/me/')
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(url, data={'text': 'Текст', 'score': 6})
+        assert response.status_code == 201
+        assert len(self.selects(queries, 'reviews_title')) == 1, (
+            'Проверьте, что при создании отзыва произведение выбирается из БД '
+            'один раз'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 201
+        assert len(self.selects(queries, 'reviews_review')) == 1, (
+            'Проверьте, что при создании комментария отзыв выбирается из БД '
+            'один раз'
+        )
+        assert not self.selects(queries, 'reviews_title')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_detail_queries(self, admin_client, admin, settings):
+        settings.API_RESPONSE_CACHE = {'ENABLED': False}
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        review_url = f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+        comment_url = f'{review_url}comments/{comments[0]["id"]}/'
+        admin_client.get('/api/v1/users/me/')
+
+        for url in (review_url, comment_url):
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.get(url)
+            assert response.status_code == 200
+            assert len(queries) == 1, (
+                f'Проверьте, что GET запрос `{url}` выполняет один запрос к БД'
+            )
+        assert 'JOIN "reviews_review"' in queries[0]['sql']
+
+        other_title = titles[1]['id']
+        for url in (
+            f'/api/v1/titles/{other_title}/reviews/{review_id}/',
+            f'/api/v1/titles/{other_title}/reviews/{review_id}/comments/{comments[0]["id"]}/',
+            f'/api/v1/titles/{other_title}/reviews/{review_id}/comments/',
+            '/api/v1/titles/100500/reviews/',
+        ):
+            assert admin_client.get(url).status_code == 404, (
+                f'Проверьте, что GET запрос `{url}` возвращает статус 404'
+            )
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_categories
+
+
+class Test23SlugFields:
+
+    def create_genres(self, admin_client, count):
+        slugs = [f'genre-{number}' for number in range(count)]
+        for slug in slugs:
+            admin_client.post(
+                '/api/v1/genres/', data={'name': slug, 'slug': slug}
+            )
+        return slugs
+
+    def post_title(self, admin_client, name, genres, category='films'):
+        return admin_client.post(
+            '/api/v1/titles/',
+            data=json.dumps({
+                'name': name, 'year': 2000, 'genre': genres,
+                'category': category,
+            }),
+            content_type='application/json',
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_constant_queries(self, admin_client):
+        from api.slugs import slug_cache
+        create_categories(admin_client)
+        genres = self.create_genres(admin_client, 12)
+        admin_client.get('/api/v1/users/me/')
+        counts = {}
+        for count in (1, 2, 12):
+            slug_cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post_title(
+                    admin_client, f'Произведение {count}', genres[:count]
+                )
+            assert response.status_code == 201, response.json()
+            assert sorted(response.json()['genre']) == sorted(genres[:count])
+            counts[count] = len(queries)
+            assert len([
+                query for query in queries
+                if 'FROM "reviews_genre"' in query['sql']
+                and '"slug" IN' in query['sql']
+            ]) == 1, (
+                'Проверьте, что все слаги жанров разрешаются одним запросом '
+                '`slug__in`'
+            )
+        assert counts[1] == counts[2] == counts[12], (
+            'Проверьте, что число запросов при создании произведения не '
+            f'зависит от числа жанров: {counts}'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_title(admin_client, 'Повтор', genres)
+        assert response.status_code == 201
+        assert not [
+            query for query in queries if '"slug" IN' in query['sql']
+            or 'FROM "reviews_category"' in query['sql']
+        ], 'Проверьте, что известные слаги берутся из кэша без запросов к БД'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_unknown_slugs(self, admin_client):
+        create_categories(admin_client)
+        genres = self.create_genres(admin_client, 2)
+        response = self.post_title(
+            admin_client, 'Произведение', genres + ['nope', 'missing', 'nope']
+        )
+        assert response.status_code == 400
+        errors = response.json()['genre']
+        assert len(errors) == 2 and 'nope' in errors[0] and (
+            'missing' in errors[1]
+        ), (
+            'Проверьте, что в ответе перечислены все несуществующие слаги '
+            'жанров'
+        )
+
+        response = self.post_title(admin_client, 'Произведение', 'genre-0')
+        assert response.status_code == 400
+        response = self.post_title(admin_client, 'Произведение', [1])
+        assert response.status_code == 400
+        response = self.post_title(
+            admin_client, 'Произведение', genres, category='nope'
+        )
+        assert response.status_code == 400
+        assert 'category' in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalidation(self, admin_client):
+        from reviews.models import Genre
+        create_categories(admin_client)
+        genres = self.create_genres(admin_client, 2)
+        response = self.post_title(admin_client, 'Первое', genres)
+        assert response.status_code == 201
+
+        admin_client.delete(f'/api/v1/genres/{genres[0]}/')
+        response = self.post_title(admin_client, 'Второе', genres)
+        assert response.status_code == 400, (
+            'Проверьте, что после удаления жанра его слаг удаляется из кэша'
+        )
+
+        genre = Genre.objects.get(slug=genres[1])
+        genre.slug = 'renamed'
+        genre.save()
+        response = self.post_title(admin_client, 'Третье', [genres[1]])
+        assert response.status_code == 400, (
+            'Проверьте, что после изменения слага жанра старый слаг удаляется '
+            'из кэша'
+        )
+        response = self.post_title(admin_client, 'Третье', ['renamed'])
+        assert response.status_code == 201
+        assert response.json()['genre'] == ['renamed']
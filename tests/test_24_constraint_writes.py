@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test24ConstraintWrites:
+
+    def selects(self, queries, table):
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        ]
+
+    def check_duplicates(self, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        data = {'name': 'Другой', 'slug': categories[0]['slug']}
+        response = admin_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 400
+        assert response.json() == {'slug': ['Указанная категория уже есть в БД']}, (
+            'Проверьте, что при создании категории с существующим слагом '
+            'возвращается ошибка поля `slug`'
+        )
+        data = {'name': 'Другой', 'slug': genres[0]['slug']}
+        response = admin_client.post('/api/v1/genres/', data=data)
+        assert response.status_code == 400
+        assert response.json() == {'slug': ['Указанный жанр уже есть в БД']}
+
+        data = {
+            'name': titles[0]['name'], 'year': titles[0]['year'],
+            'genre': [genres[2]['slug']], 'category': titles[0]['category'],
+        }
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Такое произведение уже существует в БД']
+        }
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'name': titles[0]['name'], 'year': titles[0]['year'],
+                  'category': titles[0]['category']},
+            format='json',
+        )
+        assert response.status_code == 400
+        assert 'non_field_errors' in response.json()
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201
+        response = user_client.post(url, data={'text': 'Еще', 'score': 6})
+        assert response.status_code == 400
+        assert 'non_field_errors' in response.json(), (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ошибку `non_field_errors`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_duplicates(self, admin_client, user_client):
+        self.check_duplicates(admin_client, user_client)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicates_with_validators(self, admin_client, user_client,
+                                           settings):
+        settings.API_CONSTRAINT_WRITES = False
+        self.check_duplicates(admin_client, user_client)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_no_checks_before_insert(self, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.get('/api/v1/users/me/')
+        for url, table in (
+            ('/api/v1/categories/', 'reviews_category'),
+            ('/api/v1/genres/', 'reviews_genre'),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.post(
+                    url, data={'name': 'Новый', 'slug': 'new'}
+                )
+            assert response.status_code == 201
+            assert not self.selects(queries, table), (
+                f'Проверьте, что при POST запросе `{url}` уникальность слага '
+                'проверяется ограничением БД без запроса перед записью'
+            )
+
+        data = {
+            'name': 'Новое', 'year': 2001, 'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201
+        assert not self.selects(queries, 'reviews_title'), (
+            'Проверьте, что уникальность произведения проверяется '
+            'ограничением БД без запроса перед записью'
+        )
+
+        user_client.get('/api/v1/users/me/')
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201
+        assert not self.selects(queries, 'reviews_review'), (
+            'Проверьте, что уникальность отзыва проверяется ограничением БД '
+            'без запроса перед записью'
+        )
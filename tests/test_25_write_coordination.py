@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test25WriteCoordination:
+
+    def flaky(self, failures, message='database is locked'):
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return 'ok'
+        return func, calls
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_retries(self, settings):
+        from api.writes import DatabaseBusy, run_write
+        settings.API_WRITES = {'RETRIES': 2, 'BACKOFF': 0.001}
+
+        func, calls = self.flaky(2)
+        assert run_write(func) == 'ok'
+        assert len(calls) == 3, (
+            'Проверьте, что запись повторяется, если БД заблокирована'
+        )
+
+        func, calls = self.flaky(3)
+        with pytest.raises(DatabaseBusy):
+            run_write(func)
+        assert len(calls) == 3, (
+            'Проверьте, что число повторов записи ограничено настройкой '
+            '`RETRIES`'
+        )
+
+        func, calls = self.flaky(1, message='no such table: nope')
+        with pytest.raises(OperationalError):
+            run_write(func)
+        assert len(calls) == 1
+
+        func, calls = self.flaky(1)
+        with transaction.atomic(), pytest.raises(OperationalError):
+            run_write(func)
+        assert len(calls) == 1, (
+            'Проверьте, что внутри внешней транзакции запись не повторяется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_begin_immediate(self, admin_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201
+        assert 'BEGIN IMMEDIATE' in [query['sql'] for query in queries], (
+            'Проверьте, что запись выполняется в транзакции BEGIN IMMEDIATE'
+        )
+
+        settings.API_WRITES = {'IMMEDIATE': False}
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.delete(f'{url}{response.json()["id"]}/')
+        assert response.status_code == 204
+        assert 'BEGIN IMMEDIATE' not in [query['sql'] for query in queries]
+
+    def test_03_write_queue(self):
+        from api.writes import WriteQueue
+        queue = WriteQueue()
+        active = []
+        overlaps = []
+
+        def write():
+            with queue.turn():
+                active.append(1)
+                overlaps.append(len(active))
+                time.sleep(0.001)
+                active.pop()
+
+        workers = [threading.Thread(target=write) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert overlaps == [1] * 8, (
+            'Проверьте, что очередь записи выполняет записи по одной'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_stress_command(self, capsys):
+        from reviews.models import Review, Title
+        from users.models import User
+
+        call_command('stresswrites', threads=4, writes=5)
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 3 and all('записей/с' in line for line in lines), (
+            'Проверьте, что команда `stresswrites` выводит скорость записи '
+            'для каждого режима'
+        )
+        assert 'ошибок 0 из 40' in lines[-1], (
+            'Проверьте, что с очередью записи одновременные записи '
+            'выполняются без ошибок'
+        )
+        assert not Title.objects.exists() and not Review.objects.exists()
+        assert not User.objects.filter(username__startswith='stress').exists()
@@ -0,0 +1,94 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+
+
+class Test26SqliteProfile:
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def file_connection(self, path):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+        return DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': str(path)},
+            alias='sqlite_profile',
+        )
+
+    @pytest.mark.django_db
+    def test_01_connection_pragmas(self):
+        from api.sqlite import applied_profiles
+
+        assert self.pragma(connection, 'synchronous') == 1, (
+            'Проверьте, что к соединению применяется `synchronous` из '
+            'настройки `SQLITE_PRAGMAS`'
+        )
+        assert self.pragma(connection, 'temp_store') == 2
+        assert self.pragma(connection, 'cache_size') == -64000
+        assert self.pragma(connection, 'busy_timeout') == 5000
+        assert applied_profiles['default']['synchronous'] == 1, (
+            'Проверьте, что примененные настройки SQLite сохраняются при '
+            'первом соединении'
+        )
+
+    @pytest.mark.django_db
+    def test_02_file_database(self, tmp_path, settings):
+        from api.sqlite import applied_profiles
+
+        wrapper = self.file_connection(tmp_path / 'db.sqlite3')
+        try:
+            assert self.pragma(wrapper, 'journal_mode') == 'wal', (
+                'Проверьте, что база данных в файле переводится в режим WAL'
+            )
+            assert self.pragma(wrapper, 'mmap_size') == 256 * 1024 * 1024
+            assert applied_profiles['sqlite_profile']['journal_mode'] == 'wal'
+        finally:
+            wrapper.close()
+
+        settings.SQLITE_PRAGMAS = {}
+        wrapper = self.file_connection(tmp_path / 'stock.sqlite3')
+        try:
+            assert self.pragma(wrapper, 'synchronous') == 2, (
+                'Проверьте, что без настройки `SQLITE_PRAGMAS` соединение '
+                'не изменяется'
+            )
+        finally:
+            wrapper.close()
+
+    @pytest.mark.django_db
+    def test_03_invalid_profile(self, tmp_path, settings):
+        from api.sqlite import apply_pragmas
+
+        for profile in (
+            {'page_size': 4096},
+            {'journal_mode': 'wal; DROP TABLE reviews_title'},
+            {'cache_size': 1.5},
+        ):
+            settings.SQLITE_PRAGMAS = profile
+            wrapper = self.file_connection(tmp_path / 'db.sqlite3')
+            with pytest.raises(ImproperlyConfigured):
+                wrapper.ensure_connection()
+            wrapper.close()
+        with pytest.raises(ImproperlyConfigured):
+            apply_pragmas(connection, {'foreign_keys': 'off'})
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_benchmark_command(self, capsys):
+        from reviews.models import Review, Title
+
+        call_command('benchsqlite', requests=5)
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2 and all(
+            'чтение' in line and 'запись' in line for line in lines
+        ), (
+            'Проверьте, что команда `benchsqlite` выводит скорость чтения и '
+            'записи для обоих профилей'
+        )
+        assert not Title.objects.exists() and not Review.objects.exists()
+        assert self.pragma(connection, 'synchronous') == 1, (
+            'Проверьте, что после команды `benchsqlite` восстанавливается '
+            'профиль `SQLITE_PRAGMAS`'
+        )
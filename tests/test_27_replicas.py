@@ -0,0 +1,129 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    connections.databases[REPLICA] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    settings.API_REPLICAS = {'ALIASES': [REPLICA], 'STICKY_SECONDS': 5}
+    settings.API_RESPONSE_CACHE = {'ENABLED': False}
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections._connections.replica
+    del connections.databases[REPLICA]
+
+
+class Test27Replicas:
+
+    def title_selects(self, queries):
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+
+    def read(self, client, url):
+        with CaptureQueriesContext(connection) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response, primary, replica
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_refresh_and_reads(self, client, admin_client, replica,
+                                  capsys):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        call_command('refreshreplicas')
+        assert 'replica: обновлена' in capsys.readouterr().out
+        assert Title.objects.using(replica).count() == len(titles), (
+            'Проверьте, что команда `refreshreplicas` копирует основную БД '
+            'в реплику'
+        )
+
+        for url in (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            '/api/v1/genres/',
+        ):
+            response, primary, replica_queries = self.read(client, url)
+            assert replica_queries.captured_queries, (
+                f'Проверьте, что GET запрос `{url}` читает данные из реплики'
+            )
+            assert not self.title_selects(primary)
+
+        # replica doesn't have the new title until it's refreshed
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2001, 'genre': [titles[0]['genre'][0]],
+            'category': titles[0]['category'],
+        })
+        response, primary, replica_queries = self.read(client, '/api/v1/titles/')
+        assert response.json()['count'] == len(titles) + 1, (
+            'Проверьте, что при устаревшей реплике данные читаются из '
+            'основной БД'
+        )
+        assert not replica_queries.captured_queries
+
+        call_command('refreshreplicas')
+        response, primary, replica_queries = self.read(client, '/api/v1/titles/')
+        assert response.json()['count'] == len(titles) + 1
+        assert replica_queries.captured_queries
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sticky_writer(self, client, admin_client, user_client,
+                              replica, settings):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201
+        call_command('refreshreplicas')
+
+        response, primary, replica_queries = self.read(user_client, url)
+        assert not replica_queries.captured_queries, (
+            'Проверьте, что пользователь после записи читает из основной БД'
+        )
+        response, primary, replica_queries = self.read(client, url)
+        assert replica_queries.captured_queries, (
+            'Проверьте, что другие пользователи читают из реплики'
+        )
+        assert response.json()['count'] == 1
+
+        settings.API_REPLICAS = {'ALIASES': [REPLICA], 'STICKY_SECONDS': 0}
+        response = user_client.patch(
+            f'{url}{response.json()["results"][0]["id"]}/',
+            data={'text': 'Новый текст'},
+            format='json',
+        )
+        assert response.status_code == 200
+        call_command('refreshreplicas')
+        response, primary, replica_queries = self.read(user_client, url)
+        assert replica_queries.captured_queries
+        assert response.json()['results'][0]['text'] == 'Новый текст'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_router(self, replica):
+        from api.replicas import ReplicaRouter, read_alias
+        from reviews.models import Title
+
+        router = ReplicaRouter()
+        token = read_alias.set(replica)
+        try:
+            assert router.db_for_read(Title) == replica
+            assert router.db_for_write(Title) == 'default', (
+                'Проверьте, что запись всегда выполняется в основную БД'
+            )
+        finally:
+            read_alias.reset(token)
+        assert router.db_for_read(Title) is None
+        assert router.allow_migrate(replica, 'reviews') is False
+        assert router.allow_migrate('default', 'reviews') is None